@@ -0,0 +1,85 @@
+"""LRU cache bounded by the measured size of its entries rather than their count."""
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+def deep_sizeof(value: Any) -> int:
+    """Approximate bytes held by ``value`` and the strings, containers, models and records inside it."""
+
+    size = sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        size += sys.getsizeof(value.__dict__) + sum(deep_sizeof(item) for item in value.__dict__.values())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(deep_sizeof(key) + deep_sizeof(item) for key, item in value.items())
+    elif not isinstance(value, (str, bytes)):
+        size += sum(deep_sizeof(getattr(value, name, None)) for name in getattr(type(value), "__slots__", ()))
+    return size
+
+
+class ByteBudgetCache:
+    """Least-recently-used cache holding at most ``budget`` bytes of entries.
+
+    Callers pass the size of each entry to :meth:`put`, and the least
+    recently used entries are evicted until the total fits the budget again.
+    An entry larger than the whole budget is not kept; a budget of ``0``
+    disables caching.
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value stored under ``key`` and mark it as recently used."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like :meth:`get`, without touching the recency order or the counters."""
+
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Store ``value`` as ``size`` bytes, evicting older entries beyond the budget."""
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            if size > self.budget:
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.budget:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,26 @@
+"""Command line entry point compiling ``json/`` into a course snapshot."""
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from .snapshot import compile_snapshot
+from .storage import discover_data_directory
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile the course JSON files into a snapshot.")
+    parser.add_argument("--data-dir", default=os.environ.get("COURSES_DATA_DIR"))
+    parser.add_argument("--output", default=os.environ.get("COURSES_SNAPSHOT_PATH"))
+    args = parser.parse_args(argv)
+
+    data_dir = discover_data_directory(args.data_dir)
+    output = Path(args.output) if args.output else data_dir.parent / "catalog.snapshot"
+    snapshot = compile_snapshot(data_dir, output)
+    print(f"Compiled {len(snapshot.entries)} courses from '{data_dir}' -> '{output}'")
+
+
+if __name__ == "__main__":
+    main()
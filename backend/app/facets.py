@@ -0,0 +1,154 @@
+"""Bitmap indexes over the facet fields of course metadata."""
+from __future__ import annotations
+
+import re
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+from .records import MetadataRecord
+
+# Metadata fields that can be filtered on and counted.
+FACETS = ("status", "category", "year", "topics")
+
+# ``((facet, (value, ...)), ...)``: values of one facet are OR-ed, facets are AND-ed.
+FacetFilters = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+FacetCounts = Dict[str, Dict[str, int]]
+
+# List numbering some course files put in front of their topics, e.g. "1. Foundations".
+_TOPIC_NUMBER = re.compile(r"^\d+[.)]\s*")
+
+
+def topic_label(topic: str) -> str:
+    """Return ``topic`` without its list numbering, so equal topics of different courses match."""
+
+    return _TOPIC_NUMBER.sub("", topic.strip(), count=1) or topic
+
+
+def facet_values(metadata: MetadataRecord) -> Dict[str, List[str]]:
+    """Return the values ``metadata`` has for every facet."""
+
+    values: Dict[str, List[str]] = {}
+    for facet in FACETS:
+        value = getattr(metadata, facet)
+        if facet == "topics":
+            values[facet] = list(dict.fromkeys(topic_label(topic) for topic in value))
+        elif isinstance(value, tuple):
+            values[facet] = list(dict.fromkeys(value))
+        else:
+            values[facet] = [value] if value else []
+    return values
+
+
+def normalize_filters(filters: Mapping[str, Optional[Iterable[str]]]) -> FacetFilters:
+    """Turn ``{facet: values}`` into a canonical, hashable :data:`FacetFilters`.
+
+    Topics are matched by :func:`topic_label`, with or without their numbering.
+    """
+
+    return tuple(
+        (facet, tuple(sorted({topic_label(value) for value in values} if facet == "topics" else set(values))))
+        for facet, values in sorted(filters.items())
+        if values
+    )
+
+
+class FacetIndex:
+    """Bitmaps of the courses holding each facet value.
+
+    Every course key is assigned an integer slot, and bit ``slot`` of a
+    value's bitmap is set when that course has the value. Filtering and
+    counting are then a few big-integer ``&``/``|`` operations and popcounts
+    instead of a pass over the catalogue.
+    """
+
+    def __init__(self) -> None:
+        self._bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._slots: Dict[Hashable, int] = {}
+        self._keys: List[Optional[Hashable]] = []
+        self._free: List[int] = []
+        self.all = 0
+
+    def add(self, key: Hashable, metadata: MetadataRecord) -> None:
+        slot = self._free.pop() if self._free else len(self._keys)
+        if slot == len(self._keys):
+            self._keys.append(key)
+        else:
+            self._keys[slot] = key
+        self._slots[key] = slot
+        bit = 1 << slot
+        for facet, values in facet_values(metadata).items():
+            bitmaps = self._bitmaps[facet]
+            for value in values:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+        self.all |= bit
+
+    def remove(self, key: Hashable, metadata: MetadataRecord) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        for facet, values in facet_values(metadata).items():
+            bitmaps = self._bitmaps[facet]
+            for value in values:
+                remaining = bitmaps.get(value, 0) & mask
+                if remaining:
+                    bitmaps[value] = remaining
+                else:
+                    bitmaps.pop(value, None)
+        self.all &= mask
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def bitmap(self, keys: Iterable[Hashable]) -> int:
+        """Return the bitmap of ``keys``, ignoring keys that are not indexed."""
+
+        result = 0
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is not None:
+                result |= 1 << slot
+        return result
+
+    def contains(self, bitmap: int, key: Hashable) -> bool:
+        slot = self._slots.get(key)
+        return slot is not None and bool(bitmap >> slot & 1)
+
+    def keys(self, bitmap: int) -> List[Hashable]:
+        """Return the keys whose bits are set in ``bitmap``, in slot order."""
+
+        keys: List[Hashable] = []
+        for index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+            while byte:
+                low = byte & -byte
+                keys.append(self._keys[index * 8 + low.bit_length() - 1])
+                byte ^= low
+        return keys
+
+    def match(self, filters: FacetFilters, within: Optional[int] = None) -> int:
+        """Return the bitmap of courses (among ``within``) matching ``filters``."""
+
+        result = self.all if within is None else within
+        for facet, values in filters:
+            bitmaps = self._bitmaps[facet]
+            union = 0
+            for value in values:
+                union |= bitmaps.get(value, 0)
+            result &= union
+        return result
+
+    def counts(self, filters: FacetFilters, within: Optional[int] = None) -> FacetCounts:
+        """Count the courses having each facet value.
+
+        The counts of a facet apply every filter except the one on that
+        facet, so selecting a value does not hide its alternatives.
+        """
+
+        counts: FacetCounts = {}
+        for facet in FACETS:
+            base = self.match(tuple(item for item in filters if item[0] != facet), within)
+            counts[facet] = {
+                value: count
+                for value, bitmap in sorted(self._bitmaps[facet].items())
+                if (count := (base & bitmap).bit_count())
+            }
+        return counts
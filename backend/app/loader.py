@@ -0,0 +1,54 @@
+"""Bounded offloading of blocking store calls from the event loop."""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+from .profiling import in_request_profile
+
+T = TypeVar("T")
+
+
+class AsyncLoader:
+    """Run blocking course-store calls on a small dedicated thread pool.
+
+    At most ``limit`` calls run at once. Further callers wait on a semaphore
+    in the event loop instead of queueing behind request handlers in
+    Starlette's shared threadpool, so cold loads cannot starve warm ones.
+
+    Calls run in a copy of the caller's context, so their phases count
+    towards the caller's ``Server-Timing`` and profile.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="course-loader")
+        self._semaphore = asyncio.Semaphore(limit)
+        self._inflight: Dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            call = partial(context.run, in_request_profile(function), *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+
+    async def coalesce(self, key: Hashable, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Like :meth:`run`, but callers with the same ``key`` share one in-flight call.
+
+        Waiting callers do not occupy a loader thread, and cancelling one of
+        them does not cancel the shared call.
+        """
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.run(function, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
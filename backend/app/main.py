@@ -1,23 +1,208 @@
 """FastAPI application exposing course data endpoints."""
 from __future__ import annotations
 
+import logging
 import os
-from typing import List
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, TypeVar
 
-from fastapi import Depends, FastAPI, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 
-from .models import CourseDetail, CourseSummary
-from .storage import CourseStore, discover_data_directory
+from .facets import FacetFilters, normalize_filters
+from .loader import AsyncLoader
+from .metrics import CONTENT_TYPE, MetricsMiddleware, render as render_metrics
+from .models import (
+    CourseBatchItem,
+    CourseBatchRequest,
+    CourseDetail,
+    CourseSession,
+    CourseSummary,
+    Readiness,
+    SessionOutline,
+    StoreStats,
+    Suggestion,
+)
+from .profiling import ProfilingMiddleware
+from .responses import (
+    CachedBody,
+    JSONBytesResponse,
+    cached_json_response,
+    json_bytes_response,
+    negotiate_encoding,
+    not_modified_etag,
+)
+from .shared_catalog import DEFAULT_CATALOG_DIR, SharedCatalogStore
+from .sqlite_store import SQLiteCourseStore
+from .storage import DEFAULT_SESSION_CACHE_BYTES, CourseStore, discover_data_directory
+from .timing import ServerTimingMiddleware
+
+
+MAX_PAGE_SIZE = 1000
+MAX_SUGGESTIONS = 50
+# Courses rendered per chunk of a streamed export.
+EXPORT_CHUNK_SIZE = 32
+# Threads used to load course files at startup.
+WARMUP_WORKERS = int(os.environ.get("COURSES_WARMUP_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+# Threads available to cold loads and directory scans off the event loop.
+LOADER_THREADS = int(os.environ.get("COURSES_LOADER_THREADS", "8"))
+# Seconds during which requests trust the previous data directory scan.
+REFRESH_INTERVAL = float(os.environ.get("COURSES_REFRESH_INTERVAL", "1.0"))
+# Bytes of session lists and rendered course bodies kept in memory.
+SESSION_CACHE_BYTES = int(os.environ.get("COURSES_SESSION_CACHE_BYTES", str(DEFAULT_SESSION_CACHE_BYTES)))
+
+logger = logging.getLogger("uvicorn.error")
 
+T = TypeVar("T")
 
+
+@lru_cache(maxsize=1)
 def get_store() -> CourseStore:
+    """Return the process-wide course store, creating it on first use."""
+
     data_dir = os.environ.get("COURSES_DATA_DIR")
     directory = discover_data_directory(data_dir)
-    return CourseStore(directory)
+    backend = os.environ.get("COURSES_STORE", "memory")
+    if backend == "sqlite":
+        database_path = os.environ.get("COURSES_SQLITE_PATH")
+        return SQLiteCourseStore(
+            directory,
+            Path(database_path) if database_path else directory.parent / "courses.sqlite3",
+            refresh_interval=REFRESH_INTERVAL,
+            session_cache_bytes=SESSION_CACHE_BYTES,
+        )
+    if backend == "shared":
+        catalog_dir = os.environ.get("COURSES_CATALOG_DIR")
+        return SharedCatalogStore(
+            directory,
+            Path(catalog_dir) if catalog_dir else DEFAULT_CATALOG_DIR,
+            refresh_interval=REFRESH_INTERVAL,
+            session_cache_bytes=SESSION_CACHE_BYTES,
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown COURSES_STORE {backend!r}; expected 'memory', 'sqlite' or 'shared'")
+    snapshot_path = os.environ.get("COURSES_SNAPSHOT_PATH")
+    return CourseStore(
+        directory,
+        snapshot_path=Path(snapshot_path) if snapshot_path else None,
+        refresh_interval=REFRESH_INTERVAL,
+        session_cache_bytes=SESSION_CACHE_BYTES,
+    )
+
+
+async def current_store() -> CourseStore:
+    # An async dependency, so resolving it does not hop to the threadpool.
+    return get_store()
+
+
+def request_loader(request: Request) -> AsyncLoader:
+    """The loader of the application lifespan serving ``request``."""
+
+    return request.app.state.loader
+
+
+async def call_store(
+    request: Request, store: CourseStore, method: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Call ``method`` inline when ``store`` can answer from memory, else on the loader."""
+
+    await refresh_store(request, store)
+    if store.settled():
+        return method(*args, **kwargs)
+    return await request_loader(request).run(method, *args, **kwargs)
+
+
+async def course_resource(
+    request: Request,
+    store: CourseStore,
+    method: Callable[..., CachedBody],
+    identifier: str,
+    *args: str,
+) -> CachedBody:
+    """Return ``method(identifier, *args)``, inline when the course is already in memory.
 
+    Cold courses are loaded on the loader; concurrent requests for the same
+    resource share that load.
+    """
 
-app = FastAPI(title="Courses API", version="1.0.0")
+    await refresh_store(request, store)
+    if not store.needs_scan() and store.is_resident(identifier):
+        return method(identifier, *args)
+    loader = request_loader(request)
+    return await loader.coalesce((method.__name__, identifier, *args), method, identifier, *args)
+
+
+async def refresh_store(request: Request, store: CourseStore) -> None:
+    """Rescan the data directory once the previous scan is stale; concurrent callers share it.
+
+    Only a scan the request has to wait for is awaited; otherwise the store
+    revalidates in the background and keeps serving the previous scan.
+    """
+
+    if store.needs_scan():
+        await request_loader(request).coalesce("refresh", store.refresh)
+    else:
+        store.refresh()
+
+
+async def body_response(request: Request, body: CachedBody, headers: Dict[str, str] | None = None) -> Response:
+    """:func:`cached_json_response`, rendering and compressing ``body`` on the loader the first time."""
+
+    if not_modified_etag(request, body) is None:
+        loader = request_loader(request)
+        if not body.ready():
+            await loader.run(lambda: body.content)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(body.content))
+        if encoding is not None and not body.ready(encoding):
+            await loader.run(body.encoded, encoding)
+    return cached_json_response(request, body, headers=headers)
+
+
+def warm_store(app: FastAPI) -> None:
+    """Load and index the whole catalogue, then mark the application ready."""
+
+    started = time.perf_counter()
+    try:
+        report = get_store().warm(WARMUP_WORKERS)
+    except Exception:
+        app.state.readiness = Readiness(status="failed")
+        logger.exception("Course warmup failed")
+        return
+    app.state.readiness = Readiness(status="ready", warmup=report)
+    logger.info(
+        "Course warmup finished in %.3fs: %d files, %d loaded, %d failed, %d bytes read (%s)",
+        time.perf_counter() - started,
+        report.files,
+        report.loaded,
+        report.failed,
+        report.bytes_read,
+        ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in report.phases.items()),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.readiness = Readiness(status="warming")
+    # One loader per lifespan: its threads are shut down when the lifespan ends.
+    app.state.loader = AsyncLoader(LOADER_THREADS)
+    get_store()
+    thread = threading.Thread(target=warm_store, args=(app,), name="course-warmup", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        app.state.loader.shutdown()
+
+
+app = FastAPI(title="Courses API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,11 +210,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Link", "X-Next-Cursor", "X-Total-Count"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/", summary="Service information")
-def read_root() -> dict[str, str]:
+async def read_root() -> dict[str, str]:
     return {
         "message": "English Teacher course API",
         "documentation": "/docs",
@@ -37,15 +226,167 @@ def read_root() -> dict[str, str]:
 
 
 @app.get("/health", summary="Health check")
-def healthcheck() -> dict[str, str]:
+async def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get(
+    "/ready",
+    response_model=Readiness,
+    summary="Readiness check",
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": Readiness}},
+)
+async def readiness(request: Request) -> Response:
+    state: Readiness = request.app.state.readiness
+    code = status.HTTP_200_OK if state.status == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(state.model_dump(mode="json"), status_code=code)
+
+
+@app.get("/stats", response_model=StoreStats, summary="Course store cache statistics")
+async def store_stats(request: Request, store: CourseStore = Depends(current_store)) -> StoreStats:
+    return await request_loader(request).run(store.stats)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, summary="Prometheus metrics")
+async def metrics(request: Request, store: CourseStore = Depends(current_store)) -> Response:
+    stats = await request_loader(request).run(store.stats)
+    return Response(render_metrics(stats), media_type=CONTENT_TYPE)
+
+
+async def facet_filters(
+    status: List[str] | None = Query(default=None, description="Keep courses with any of these statuses."),
+    category: List[str] | None = Query(default=None, description="Keep courses in any of these categories."),
+    year: List[str] | None = Query(default=None, description="Keep courses from any of these years."),
+    topics: List[str] | None = Query(default=None, description="Keep courses covering any of these topics."),
+) -> FacetFilters:
+    return normalize_filters({"status": status, "category": category, "year": year, "topics": topics})
+
+
 @app.get("/courses", response_model=List[CourseSummary], summary="List courses")
-def list_courses(store: CourseStore = Depends(get_store), search: str | None = Query(default=None)) -> List[CourseSummary]:
-    if search:
-        return store.search(search)
-    return store.list_courses()
+async def list_courses(
+    request: Request,
+    store: CourseStore = Depends(current_store),
+    filters: FacetFilters = Depends(facet_filters),
+    search: str | None = Query(default=None),
+    sort: str | None = Query(
+        default=None,
+        pattern=r"^-?(title|file|updated)$",
+        description="Sort by title, natural file order or update time; prefix with '-' to reverse.",
+    ),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, description="The X-Next-Cursor value of the previous page."),
+    fields: str | None = Query(default=None, description="Comma-separated summary fields, e.g. id,slug,title."),
+) -> Response:
+    page = await call_store(
+        request,
+        store,
+        store.list_page,
+        query=search,
+        sort=sort,
+        cursor=cursor,
+        limit=limit,
+        fields=_parse_fields(fields, CourseSummary),
+        filters=filters,
+    )
+    headers = {"X-Total-Count": str(page.total)}
+    if page.next_cursor:
+        next_url = request.url.include_query_params(cursor=page.next_cursor)
+        headers["X-Next-Cursor"] = page.next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return await body_response(request, page.body, headers=headers)
+
+
+@app.get(
+    "/facets",
+    response_model=Dict[str, Dict[str, int]],
+    summary="Count courses per status, category, year and topic",
+)
+async def facet_counts(
+    request: Request,
+    store: CourseStore = Depends(current_store),
+    filters: FacetFilters = Depends(facet_filters),
+    search: str | None = Query(default=None),
+) -> Response:
+    """Facet counts for the courses ``/courses`` returns with the same ``search`` and filters.
+
+    A facet's own filter is ignored when counting its values, so every
+    alternative to the current selection keeps its count.
+    """
+
+    return await body_response(request, await call_store(request, store, store.facets_body, search, filters))
+
+
+@app.get("/suggest", response_model=List[Suggestion], summary="Autocomplete course titles, topics and sessions")
+async def suggest(
+    request: Request,
+    store: CourseStore = Depends(current_store),
+    q: str = Query(min_length=1, max_length=200, description="What has been typed so far."),
+    limit: int = Query(default=10, ge=1, le=MAX_SUGGESTIONS),
+) -> Response:
+    return JSONBytesResponse(await call_store(request, store, store.suggest_body, q, limit))
+
+
+def _parse_fields(fields: str | list[str] | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = set(name.strip() for name in fields if name.strip())
+    unknown = sorted(names.difference(model.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    # Model order, so every spelling of a selection shares one cached projection.
+    return tuple(name for name in model.model_fields if name in names) or None
+
+
+@app.post(
+    "/courses/batch",
+    response_model=List[CourseBatchItem],
+    summary="Retrieve several courses by slug or identifier",
+)
+async def batch_courses(
+    batch: CourseBatchRequest,
+    request: Request,
+    store: CourseStore = Depends(current_store),
+) -> Response:
+    fields = _parse_fields(batch.fields, CourseDetail)
+    await refresh_store(request, store)
+    loader = request_loader(request)
+    if not store.needs_scan() and all(store.is_resident(identifier) for identifier in batch.ids):
+        content = store.batch_body(batch.ids, fields)
+    else:
+        content = await loader.run(store.batch_body, batch.ids, fields)
+    if negotiate_encoding(request.headers.get("accept-encoding"), len(content)) is None:
+        return json_bytes_response(request, content)
+    # Batches are compressed on every request, which is too slow for the event loop.
+    return await loader.run(json_bytes_response, request, content)
+
+
+@app.get(
+    "/export.ndjson",
+    response_class=StreamingResponse,
+    summary="Stream every course detail as newline-delimited JSON",
+)
+async def export_catalogue(
+    request: Request,
+    store: CourseStore = Depends(current_store),
+    since: datetime | None = Query(default=None, description="Only export courses updated at or after this time."),
+) -> StreamingResponse:
+    lines = await call_store(request, store, store.export_lines, since)
+    loader = request_loader(request)
+
+    async def chunks() -> AsyncIterator[bytes]:
+        while True:
+            # Courses whose sessions were evicted are read again, so chunks are rendered off the loop.
+            chunk = await loader.run(lambda: b"".join(islice(lines, EXPORT_CHUNK_SIZE)))
+            if not chunk:
+                return
+            yield chunk
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
 
 
 @app.get(
@@ -53,5 +394,29 @@ def list_courses(store: CourseStore = Depends(get_store), search: str | None = Q
     response_model=CourseDetail,
     summary="Retrieve a course by slug or identifier",
 )
-def get_course(identifier: str, store: CourseStore = Depends(get_store)) -> CourseDetail:
-    return store.get_course(identifier)
+async def get_course(identifier: str, request: Request, store: CourseStore = Depends(current_store)) -> Response:
+    return await body_response(request, await course_resource(request, store, store.course_body, identifier))
+
+
+@app.get(
+    "/courses/{identifier}/sessions",
+    response_model=List[SessionOutline],
+    summary="List the ids, titles and ranks of a course's sessions",
+)
+async def list_sessions(identifier: str, request: Request, store: CourseStore = Depends(current_store)) -> Response:
+    return await body_response(request, await course_resource(request, store, store.outline_body, identifier))
+
+
+@app.get(
+    "/courses/{identifier}/sessions/{session_id}",
+    response_model=CourseSession,
+    summary="Retrieve one session of a course by session id or slug",
+)
+async def get_session(
+    identifier: str,
+    session_id: str,
+    request: Request,
+    store: CourseStore = Depends(current_store),
+) -> Response:
+    body = await course_resource(request, store, store.session_body, identifier, session_id)
+    return await body_response(request, body)
@@ -0,0 +1,186 @@
+"""Minimal Prometheus metrics: counters and histograms in text exposition format."""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .models import StoreStats
+
+# Upper bounds (seconds) shared by the latency histograms.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative histogram with optional labels.
+
+    :meth:`observe` is a bisect and three additions under a lock, cheap
+    enough to call on every request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+REQUEST_SECONDS = Histogram(
+    "courses_http_request_duration_seconds",
+    "Time to answer HTTP requests, by route template.",
+    ("method", "route", "status"),
+)
+DECODE_SECONDS = Histogram(
+    "courses_store_decode_seconds",
+    "Time to read, decode and validate one course file.",
+)
+REBUILD_SECONDS = Histogram(
+    "courses_store_rebuild_seconds",
+    "Time to rebuild a derived index or cached body after the catalogue changed.",
+    ("index",),
+)
+HISTOGRAMS = (REQUEST_SECONDS, DECODE_SECONDS, REBUILD_SECONDS)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording :data:`REQUEST_SECONDS` for every HTTP request.
+
+    Requests are labelled with the matched route template (``/courses/{identifier}``)
+    rather than the raw path, which keeps the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], route, str(status_code))
+
+
+def render(stats: StoreStats) -> str:
+    """Return every metric, including ``stats`` of the course store, as exposition text."""
+
+    lines: List[str] = []
+    store_metrics = (
+        ("courses_store_files", "gauge", "Course files found in the data directory.", stats.files),
+        ("courses_store_loaded", "gauge", "Courses loaded and indexed.", stats.cached),
+        ("courses_store_hits_total", "counter", "Lookups answered from the cache.", stats.hits),
+        ("courses_store_misses_total", "counter", "Lookups that had to load a course file.", stats.misses),
+        ("courses_store_coalesced_total", "counter", "Loads that joined an identical in-flight load.", stats.coalesced),
+        ("courses_store_bytes_read_total", "counter", "Bytes read from course files.", stats.bytes_read),
+        ("courses_store_catalog_version", "gauge", "Version of the catalogue, bumped on every change.", stats.version),
+        ("courses_store_collisions", "gauge", "Ids or slugs claimed by several course files.", len(stats.collisions)),
+        (
+            "courses_session_cache_hits_total",
+            "counter",
+            "Session cache lookups served from memory.",
+            stats.session_cache_hits,
+        ),
+        (
+            "courses_session_cache_misses_total",
+            "counter",
+            "Session cache lookups that had to load or render.",
+            stats.session_cache_misses,
+        ),
+        (
+            "courses_session_cache_hit_ratio",
+            "gauge",
+            "Share of session cache lookups that hit.",
+            stats.session_cache_hit_ratio,
+        ),
+        (
+            "courses_session_cache_evictions_total",
+            "counter",
+            "Entries evicted to stay within the byte budget.",
+            stats.session_cache_evictions,
+        ),
+        (
+            "courses_session_cache_resident_bytes",
+            "gauge",
+            "Measured bytes held by the session cache.",
+            stats.session_cache_bytes,
+        ),
+        (
+            "courses_session_cache_budget_bytes",
+            "gauge",
+            "Byte budget of the session cache.",
+            stats.session_cache_budget,
+        ),
+    )
+    for name, kind, documentation, value in store_metrics:
+        lines.extend((f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"))
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from pydantic import BaseModel, Field
 
+from .timing import phase
+
 
 class CourseMetadata(BaseModel):
     """High level metadata extracted from the course JSON files."""
@@ -47,6 +48,14 @@ class CourseSession(BaseModel):
     rank: Optional[int] = None
 
 
+class SessionOutline(BaseModel):
+    """Position of a session inside a course, as listed by the outline endpoint."""
+
+    id: str
+    title: Optional[str] = None
+    rank: Optional[int] = None
+
+
 class CourseSummary(BaseModel):
     """Summary information surfaced in the course list view."""
 
@@ -68,69 +77,74 @@ class CourseDetail(CourseSummary):
     sessions: List[CourseSession] = Field(default_factory=list)
 
 
-def build_metadata(raw: dict[str, Any], source: Path, fallback_slug: str) -> CourseMetadata:
-    """Transform raw ``listData`` dictionaries into :class:`CourseMetadata`."""
-
-    topics = raw.get("topics") or []
-    date_str = raw.get("date")
-    updated = None
-    if isinstance(date_str, str):
-        try:
-            updated = datetime.fromisoformat(date_str.strip())
-        except ValueError:
-            updated = None
-
-    slug = raw.get("slug") or fallback_slug
-    course_id = raw.get("id") or raw.get("slug") or raw.get("name") or fallback_slug
-
-    metadata = CourseMetadata(
-        id=str(course_id),
-        slug=str(slug),
-        title=raw.get("title") or raw.get("name") or fallback_slug,
-        name=raw.get("name"),
-        tagline=raw.get("tagline"),
-        description=raw.get("description"),
-        status=raw.get("status"),
-        category=raw.get("cat"),
-        cta=raw.get("cta"),
-        year=raw.get("year"),
-        updated=updated,
-        topics=[str(topic) for topic in topics],
-        source=str(source),
+class Suggestion(BaseModel):
+    """An autocomplete suggestion: a course title, topic or session title."""
+
+    text: str
+    kind: str
+    courses: int
+
+
+# Largest number of identifiers accepted by one batch request.
+MAX_BATCH_SIZE = 100
+
+
+class CourseBatchRequest(BaseModel):
+    """Identifiers (file stems, ids or slugs) to fetch in one request."""
+
+    ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Course detail fields to include, e.g. id, title, sessions.",
     )
-    return metadata
-
-
-def build_sessions(raw_sessions: Iterable[dict[str, Any]]) -> List[CourseSession]:
-    """Convert raw session dictionaries to :class:`CourseSession` objects."""
-
-    sessions: List[CourseSession] = []
-    for raw in raw_sessions:
-        if not isinstance(raw, dict):
-            continue
-        session_id = raw.get("id") or raw.get("slug")
-        if not session_id:
-            continue
-        session = CourseSession(
-            id=str(session_id),
-            title=raw.get("title") or raw.get("name"),
-            name=raw.get("name"),
-            slug=raw.get("slug"),
-            tagline=raw.get("tagline"),
-            description=raw.get("description"),
-            keyIdeas=[str(item) for item in raw.get("key-ideas", []) if isinstance(item, str)],
-            status=raw.get("status"),
-            category=raw.get("cat"),
-            db=raw.get("db"),
-            collection=raw.get("collection"),
-            data=raw.get("data"),
-            callToAction=raw.get("cta"),
-            year=raw.get("year"),
-            image=raw.get("image"),
-            rank=raw.get("rank"),
-        )
-        sessions.append(session)
-    return sessions
+
+
+class CourseBatchItem(BaseModel):
+    """Result for one requested identifier; ``course`` is set when ``status`` is 200."""
+
+    id: str
+    status: int
+    course: Optional[CourseDetail] = None
+    detail: Optional[str] = None
+
+
+class StoreStats(BaseModel):
+    """Cache counters reported by the shared course store."""
+
+    files: int
+    cached: int
+    hits: int
+    misses: int
+    # Lookups that waited for an identical in-flight load instead of repeating it.
+    coalesced: int = 0
+    bytes_read: int = 0
+    # Incremented whenever a course is added, changed or removed.
+    version: int = 0
+    collisions: Dict[str, List[str]] = Field(default_factory=dict)
+    # Byte-budgeted cache of session lists and rendered course bodies.
+    session_cache_hits: int = 0
+    session_cache_misses: int = 0
+    session_cache_hit_ratio: float = 0.0
+    session_cache_evictions: int = 0
+    session_cache_bytes: int = 0
+    session_cache_budget: int = 0
+
+
+class WarmupReport(BaseModel):
+    """Outcome of loading the catalogue at application startup."""
+
+    files: int
+    loaded: int
+    failed: int
+    bytes_read: int
+    phases: Dict[str, float] = Field(default_factory=dict)
+
+
+class Readiness(BaseModel):
+    """Readiness probe payload."""
+
+    status: str
+    warmup: Optional[WarmupReport] = None
 
 
 def build_summary(metadata: CourseMetadata) -> CourseSummary:
@@ -152,8 +166,9 @@ def build_summary(metadata: CourseMetadata) -> CourseSummary:
 def build_detail(metadata: CourseMetadata, sessions: Iterable[CourseSession]) -> CourseDetail:
     """Create a :class:`CourseDetail` from metadata and sessions."""
 
-    return CourseDetail(
-        **build_summary(metadata).model_dump(),
-        metadata=metadata,
-        sessions=list(sessions),
-    )
+    with phase("build-model"):
+        return CourseDetail(
+            **build_summary(metadata).model_dump(),
+            metadata=metadata,
+            sessions=list(sessions),
+        )
@@ -0,0 +1,155 @@
+"""Opt-in sampling profiler for requests served in production.
+
+Profiling is off unless ``COURSES_PROFILE_SAMPLE_RATE`` is set to ``N``, in
+which case one in every ``N`` requests is run under :mod:`cProfile`. Clients
+whose address is listed in ``COURSES_PROFILE_ALLOWED_IPS`` can also ask for a
+profile of a single request with the ``X-Courses-Profile`` header. Profiles
+are written as :mod:`pstats` files to ``COURSES_PROFILE_DIR``; inspect them
+with ``python -m pstats`` or snakeviz.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import itertools
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Collection, List, Optional, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Profile one in this many requests; 0 disables sampling.
+SAMPLE_RATE = int(os.environ.get("COURSES_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = Path(os.environ.get("COURSES_PROFILE_DIR") or Path(tempfile.gettempdir()) / "courses-profiles")
+# Client addresses allowed to request a profile with PROFILE_HEADER.
+ALLOWED_IPS = frozenset(
+    address.strip() for address in os.environ.get("COURSES_PROFILE_ALLOWED_IPS", "").split(",") if address.strip()
+)
+PROFILE_HEADER = b"x-courses-profile"
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_active: ContextVar[Optional[RequestProfile]] = ContextVar("courses_request_profile", default=None)
+# Only one request is profiled at a time: a thread has a single profiler, and
+# the event loop thread is shared by every request.
+_busy = threading.Lock()
+
+
+class RequestProfile:
+    """The per-thread :class:`cProfile.Profile` objects collected for one request."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    def run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``function`` with a profiler enabled on the current thread."""
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    async def run_async(self, function: Callable[..., Any], *args: Any) -> None:
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await function(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def dump(self, path: Path) -> None:
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(path)
+
+
+def in_request_profile(function: Callable[..., T]) -> Callable[..., T]:
+    """Wrap ``function`` so it is profiled with the current request, if that is being profiled.
+
+    Call this on the request's thread; the returned callable may run on any thread.
+    """
+
+    profile = _active.get()
+    if profile is None:
+        return function
+
+    @wraps(function)
+    def profiled(*args: Any, **kwargs: Any) -> T:
+        return profile.run(function, *args, **kwargs)
+
+    return profiled
+
+
+class ProfilingMiddleware:
+    """ASGI middleware writing a profile for sampled or explicitly requested requests.
+
+    The event loop thread is profiled for the whole request, so other
+    requests interleaved with it show up too; work the request runs on
+    :class:`.AsyncLoader` threads is profiled on its own and merged in.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: int = SAMPLE_RATE,
+        directory: Path = PROFILE_DIR,
+        allowed_ips: Collection[str] = ALLOWED_IPS,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.allowed_ips = frozenset(allowed_ips)
+        self._requests = itertools.count(1)
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.allowed_ips:
+            client = scope.get("client")
+            if client and client[0] in self.allowed_ips:
+                if any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+                    return True
+        return self.sample_rate > 0 and next(self._requests) % self.sample_rate == 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope) or not _busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _active.set(profile)
+        try:
+            await profile.run_async(self.app, scope, receive, send)
+        finally:
+            _active.reset(token)
+            _busy.release()
+            path = self.directory / f"{time.time_ns()}-{scope['method']}-{_slug(scope['path'])}.prof"
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, profile.dump, path)
+            except OSError:
+                logger.exception("Could not write request profile to %s", path)
+            else:
+                logger.info("Wrote profile of %s %s to %s", scope["method"], scope["path"], path)
+
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", path).strip("_")[:80] or "root"
@@ -0,0 +1,34 @@
+"""Command line entry point publishing catalogue generations for ``COURSES_STORE=shared`` workers."""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from .shared_catalog import DEFAULT_CATALOG_DIR, CatalogPublisher
+from .storage import discover_data_directory
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Publish the course catalogue to the workers sharing it.")
+    parser.add_argument("--data-dir", default=os.environ.get("COURSES_DATA_DIR"))
+    parser.add_argument("--catalog-dir", default=os.environ.get("COURSES_CATALOG_DIR"))
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between data directory checks")
+    parser.add_argument("--once", action="store_true", help="publish a single generation and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    data_dir = discover_data_directory(args.data_dir)
+    catalog_dir = Path(args.catalog_dir) if args.catalog_dir else DEFAULT_CATALOG_DIR
+    publisher = CatalogPublisher(data_dir, catalog_dir)
+    if args.once:
+        generation = publisher.publish_if_changed()
+        print(f"Published generation {generation} of '{data_dir}' to '{catalog_dir}'")
+    else:
+        publisher.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()
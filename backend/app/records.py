@@ -0,0 +1,295 @@
+"""Compact in-memory course records and the typed decoder that produces them.
+
+The store keeps a :class:`MetadataRecord` for every course and, while they
+are cached, a list of :class:`SessionRecord` objects. Both are ``__slots__``
+classes without a per-instance ``__dict__`` or pydantic validation state.
+They are converted to the API models only when a response body is
+rendered, which never happens for bodies served from the cache.
+
+Course files are validated straight from their bytes by pydantic's JSON
+parser into the typed dictionaries below, which skips the fields the API
+never serves (such as the long ``listData.content``) and shares the short
+strings repeated across courses.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from pydantic import Field, TypeAdapter, ValidationError
+from typing_extensions import Annotated, TypedDict
+
+from .models import CourseDetail, CourseMetadata, CourseSession, build_detail
+
+
+class CourseDecodeError(ValueError):
+    """Raised when course data is not valid JSON or does not match the expected field types."""
+
+
+class MetadataRecord:
+    """Course metadata as held by the store; attributes match :class:`CourseMetadata`."""
+
+    __slots__ = tuple(CourseMetadata.model_fields)
+
+    def __init__(
+        self,
+        *,
+        id: str,
+        slug: str,
+        title: str,
+        source: str,
+        name: Optional[str] = None,
+        tagline: Optional[str] = None,
+        description: Optional[str] = None,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        cta: Optional[str] = None,
+        year: Optional[str] = None,
+        updated: Optional[datetime] = None,
+        topics: Tuple[str, ...] = (),
+    ) -> None:
+        self.id = id
+        self.slug = slug
+        self.title = title
+        self.name = name
+        self.tagline = tagline
+        self.description = description
+        self.status = status
+        self.category = category
+        self.cta = cta
+        self.year = year
+        self.updated = updated
+        self.topics = topics
+        self.source = source
+
+    def to_model(self) -> CourseMetadata:
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["topics"] = list(self.topics)
+        return CourseMetadata.model_construct(**values)
+
+
+class SessionRecord:
+    """A course session as held by the store; attributes match :class:`CourseSession`."""
+
+    __slots__ = tuple(CourseSession.model_fields)
+
+    def __init__(
+        self,
+        *,
+        id: str,
+        title: Optional[str] = None,
+        name: Optional[str] = None,
+        slug: Optional[str] = None,
+        tagline: Optional[str] = None,
+        description: Optional[str] = None,
+        keyIdeas: Tuple[str, ...] = (),
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        db: Optional[str] = None,
+        collection: Optional[str] = None,
+        data: Optional[str] = None,
+        callToAction: Optional[str] = None,
+        year: Optional[str] = None,
+        image: Optional[str] = None,
+        rank: Optional[int] = None,
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.name = name
+        self.slug = slug
+        self.tagline = tagline
+        self.description = description
+        self.keyIdeas = keyIdeas
+        self.status = status
+        self.category = category
+        self.db = db
+        self.collection = collection
+        self.data = data
+        self.callToAction = callToAction
+        self.year = year
+        self.image = image
+        self.rank = rank
+
+    def to_model(self) -> CourseSession:
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["keyIdeas"] = list(self.keyIdeas)
+        return CourseSession.model_construct(**values)
+
+
+def to_detail(metadata: MetadataRecord, sessions: Iterable[SessionRecord]) -> CourseDetail:
+    """Build the :class:`CourseDetail` API model of a course from its records."""
+
+    return build_detail(metadata.to_model(), [session.to_model() for session in sessions])
+
+
+# Fields read from course files; ``Any`` values are normalised when the records are built.
+class _ListData(TypedDict, total=False):
+    id: Any
+    slug: Any
+    name: Optional[str]
+    title: Optional[str]
+    tagline: Optional[str]
+    description: Optional[str]
+    status: Optional[str]
+    category: Annotated[Optional[str], Field(alias="cat")]
+    cta: Optional[str]
+    year: Optional[str]
+    date: Any
+    topics: Any
+
+
+class _ListItem(TypedDict, total=False):
+    id: Any
+    slug: Optional[str]
+    name: Optional[str]
+    title: Optional[str]
+    tagline: Optional[str]
+    description: Optional[str]
+    key_ideas: Annotated[Any, Field(alias="key-ideas")]
+    status: Optional[str]
+    category: Annotated[Optional[str], Field(alias="cat")]
+    db: Optional[str]
+    collection: Optional[str]
+    data: Optional[str]
+    cta: Optional[str]
+    year: Optional[str]
+    image: Optional[str]
+    rank: Optional[int]
+
+
+class _Course(TypedDict, total=False):
+    listData: Optional[_ListData]
+    listItems: Optional[List[_ListItem]]
+
+
+# Fallback when ``listItems`` holds entries that are not objects; see :func:`_valid_items`.
+class _LooseCourse(TypedDict, total=False):
+    listData: Optional[_ListData]
+    listItems: Any
+
+
+_course_adapter = TypeAdapter(_Course)
+_items_adapter = TypeAdapter(List[_ListItem])
+_loose_course_adapter = TypeAdapter(_LooseCourse)
+_loose_items_adapter = TypeAdapter(List[Any])
+_item_adapter = TypeAdapter(_ListItem)
+
+
+def _decode_error(exc: ValidationError, prefix: Tuple[Union[str, int], ...] = ()) -> CourseDecodeError:
+    error = exc.errors(include_url=False)[0]
+    location = "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in (*prefix, *error["loc"]))
+    return CourseDecodeError(f"{error['msg']} at ${location}" if location else error["msg"])
+
+
+def _valid_items(items: Any, prefix: Tuple[Union[str, int], ...] = ()) -> List[_ListItem]:
+    """Validate the object entries of ``items`` one at a time, skipping every other entry.
+
+    Mistyped fields of an object entry still raise :class:`CourseDecodeError`.
+    """
+
+    if not isinstance(items, list):
+        return []
+    valid: List[_ListItem] = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        try:
+            valid.append(_item_adapter.validate_python(item))
+        except ValidationError as exc:
+            raise _decode_error(exc, (*prefix, index)) from exc
+    return valid
+
+
+def _metadata_record(values: _ListData, source: str, fallback_slug: str) -> MetadataRecord:
+    updated = None
+    date = values.get("date")
+    if isinstance(date, str):
+        try:
+            updated = datetime.fromisoformat(date.strip())
+        except ValueError:
+            updated = None
+    slug = values.get("slug") or fallback_slug
+    course_id = values.get("id") or values.get("slug") or values.get("name") or fallback_slug
+    return MetadataRecord(
+        id=str(course_id),
+        slug=str(slug),
+        title=values.get("title") or values.get("name") or fallback_slug,
+        name=values.get("name"),
+        tagline=values.get("tagline"),
+        description=values.get("description"),
+        status=values.get("status"),
+        category=values.get("category"),
+        cta=values.get("cta"),
+        year=values.get("year"),
+        updated=updated,
+        topics=tuple(str(topic) for topic in values.get("topics") or ()),
+        source=source,
+    )
+
+
+def _session_records(items: Iterable[_ListItem]) -> List[SessionRecord]:
+    sessions: List[SessionRecord] = []
+    for values in items:
+        session_id = values.get("id") or values.get("slug")
+        if not session_id:
+            continue
+        sessions.append(
+            SessionRecord(
+                id=str(session_id),
+                title=values.get("title") or values.get("name"),
+                name=values.get("name"),
+                slug=values.get("slug"),
+                tagline=values.get("tagline"),
+                description=values.get("description"),
+                keyIdeas=tuple(item for item in values.get("key_ideas") or () if isinstance(item, str)),
+                status=values.get("status"),
+                category=values.get("category"),
+                db=values.get("db"),
+                collection=values.get("collection"),
+                data=values.get("data"),
+                callToAction=values.get("cta"),
+                year=values.get("year"),
+                image=values.get("image"),
+                rank=values.get("rank"),
+            )
+        )
+    return sessions
+
+
+def decode_course(
+    data: bytes, source: str, fallback_slug: str
+) -> Optional[Tuple[MetadataRecord, List[SessionRecord]]]:
+    """Decode the bytes of a course file into its records.
+
+    Returns ``None`` when the file has no ``listData``. Raises
+    :class:`CourseDecodeError` for invalid JSON or mistyped fields.
+    ``listItems`` entries that are not objects are skipped.
+    """
+
+    try:
+        course = _course_adapter.validate_json(data)
+        items: Iterable[_ListItem] = course.get("listItems") or ()
+    except ValidationError:
+        try:
+            loose = _loose_course_adapter.validate_json(data)
+        except ValidationError as exc:
+            raise _decode_error(exc) from exc
+        course = {"listData": loose.get("listData")}
+        items = _valid_items(loose.get("listItems"), ("listItems",))
+    list_data = course.get("listData")
+    if not list_data:
+        return None
+    return _metadata_record(list_data, source, fallback_slug), _session_records(items)
+
+
+def decode_sessions(data: bytes) -> List[SessionRecord]:
+    """Decode a JSON array of ``listItems`` entries into session records, skipping non-objects."""
+
+    try:
+        return _session_records(_items_adapter.validate_json(data))
+    except ValidationError:
+        try:
+            items = _loose_items_adapter.validate_json(data)
+        except ValidationError as exc:
+            raise _decode_error(exc) from exc
+    return _session_records(_valid_items(items))
@@ -0,0 +1,255 @@
+"""Response helpers for serving pre-serialised JSON bodies."""
+from __future__ import annotations
+
+import gzip
+import itertools
+import os
+import sys
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request, Response, status
+
+from .cache import ByteBudgetCache
+from .timing import phase
+
+try:  # Brotli is optional; without it only gzip is offered.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Bodies smaller than this many bytes are always sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COURSES_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Cheaper levels for bodies compressed on every request instead of once per content version.
+UNCACHED_GZIP_LEVEL = 6
+UNCACHED_BROTLI_QUALITY = 4
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda content: gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0),
+}
+_UNCACHED_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda content: gzip.compress(content, compresslevel=UNCACHED_GZIP_LEVEL, mtime=0),
+}
+if brotli is not None:
+    _COMPRESSORS["br"] = lambda content: brotli.compress(content, quality=BROTLI_QUALITY)
+    _UNCACHED_COMPRESSORS["br"] = lambda content: brotli.compress(content, quality=UNCACHED_BROTLI_QUALITY)
+
+# Preferred encodings when the client accepts several with the same weight.
+_PREFERENCE = ("br", "gzip")
+
+# Unique cache keys for bodies; ids could be reused once a body is collected.
+_body_keys = itertools.count()
+
+
+class JSONBytesResponse(Response):
+    """Send an already encoded UTF-8 JSON body without re-validating it.
+
+    Endpoints still declare ``response_model`` for the OpenAPI schema, but
+    returning a :class:`~fastapi.Response` skips FastAPI's validation and
+    encoding, which the store has already done once per content version.
+    """
+
+    media_type = "application/json"
+
+
+class CachedBody:
+    """A lazily rendered JSON body together with its cache validators.
+
+    ``etag`` and ``last_modified`` are known up front so conditional requests
+    can be answered without ever calling ``render``. The rendered and
+    compressed bytes are kept on the body, or in ``cache`` when given, where
+    they may be evicted and rendered again later.
+    """
+
+    def __init__(
+        self,
+        etag: str,
+        last_modified: float,
+        render: Callable[[], bytes],
+        cache: Optional[ByteBudgetCache] = None,
+    ) -> None:
+        self.digest = etag
+        self.etag = f'"{etag}"'
+        self.last_modified = last_modified
+        self._render = render
+        self._cache = cache
+        self._key = next(_body_keys)
+        # Rendered bytes by content coding, ``None`` being the identity.
+        self._variants: Dict[Optional[str], bytes] = {}
+        self._lock = threading.RLock()
+
+    def _lookup(self, encoding: Optional[str]) -> Optional[bytes]:
+        if self._cache is None:
+            return self._variants.get(encoding)
+        return self._cache.get((self._key, encoding))
+
+    def _peek(self, encoding: Optional[str]) -> Optional[bytes]:
+        if self._cache is None:
+            return self._variants.get(encoding)
+        return self._cache.peek((self._key, encoding))
+
+    def _store(self, encoding: Optional[str], body: bytes) -> None:
+        if self._cache is None:
+            self._variants[encoding] = body
+        else:
+            self._cache.put((self._key, encoding), body, sys.getsizeof(body))
+
+    def _variant(self, encoding: Optional[str], produce: Callable[[], bytes]) -> bytes:
+        body = self._lookup(encoding)
+        if body is None:
+            with self._lock:
+                body = self._peek(encoding)
+                if body is None:
+                    body = produce()
+                    self._store(encoding, body)
+        return body
+
+    @property
+    def content(self) -> bytes:
+        """The rendered body; concurrent first readers share a single render."""
+
+        return self._variant(None, self._serialize)
+
+    def _serialize(self) -> bytes:
+        with phase("serialize"):
+            return self._render()
+
+    @property
+    def rendered(self) -> Optional[bytes]:
+        """:attr:`content` if it has been rendered already, otherwise ``None``."""
+
+        return self._peek(None)
+
+    def ready(self, encoding: Optional[str] = None) -> bool:
+        """Whether the ``encoding`` representation is cached, so sending it costs no rendering."""
+
+        return self._peek(encoding) is not None
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return :attr:`content` compressed with ``encoding``, compressing only once."""
+
+        def compress() -> bytes:
+            content = self.content
+            with phase("serialize"):
+                return _COMPRESSORS[encoding](content)
+
+        return self._variant(encoding, compress)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of the representation sent with ``encoding``."""
+
+        return self.etag if encoding is None else f'"{self.digest}-{encoding}"'
+
+
+def _matching_etag(header: str, body: CachedBody) -> Optional[str]:
+    """Weakly compare ``If-None-Match`` against every encoding of ``body``."""
+
+    if header.strip() == "*":
+        return body.etag
+    etags = {body.etag_for(None), *(body.etag_for(encoding) for encoding in _COMPRESSORS)}
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return candidate
+    return None
+
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """Pick the best supported content coding for a body of ``size`` bytes."""
+
+    if not accept_encoding or size < COMPRESSION_MIN_SIZE:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    candidates: List[str] = []
+    for encoding in _PREFERENCE:
+        if encoding in _COMPRESSORS and weights.get(encoding, weights.get("*", 0.0)) > 0:
+            candidates.append(encoding)
+    if not candidates:
+        return None
+    return max(candidates, key=lambda encoding: weights.get(encoding, weights.get("*", 0.0)))
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None or since.tzinfo is None:
+        return False
+    return int(last_modified) <= since.timestamp()
+
+
+def not_modified_etag(request: Request, body: CachedBody) -> Optional[str]:
+    """Evaluate ``If-None-Match`` / ``If-Modified-Since`` against ``body``.
+
+    Returns the ETag to send with a ``304`` response, or ``None`` when the
+    full body is needed. ``If-Modified-Since`` is ignored when
+    ``If-None-Match`` is present, as required by RFC 9110.
+    """
+
+    if_none_match: Optional[str] = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _matching_etag(if_none_match, body)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and _not_modified_since(if_modified_since, body.last_modified):
+        return body.etag
+    return None
+
+
+def cached_json_response(
+    request: Request,
+    body: CachedBody,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Return ``304 Not Modified`` or the cached JSON body for ``request``.
+
+    The body is compressed with the best encoding the client accepts; the
+    compressed bytes are cached on ``body`` next to the uncompressed ones.
+    """
+
+    headers = {
+        **(headers or {}),
+        "Last-Modified": formatdate(body.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    etag = not_modified_etag(request, body)
+    if etag is not None:
+        headers["ETag"] = etag
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content = body.content
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(content))
+    headers["ETag"] = body.etag_for(encoding)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        content = body.encoded(encoding)
+    return JSONBytesResponse(content, headers=headers)
+
+
+def json_bytes_response(request: Request, content: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Return an uncached JSON body, compressed with the best encoding ``request`` accepts."""
+
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(content))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        with phase("serialize"):
+            content = _UNCACHED_COMPRESSORS[encoding](content)
+    return JSONBytesResponse(content, headers=headers)
@@ -0,0 +1,213 @@
+"""In-memory inverted index with BM25 ranking for course search."""
+from __future__ import annotations
+
+import functools
+import heapq
+import math
+import re
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .records import MetadataRecord, SessionRecord
+from .trigrams import TrigramIndex
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be by for from has have in into is it its of on or that the their this to was were
+    will with
+    """.split()
+)
+
+# Suffixes stripped by :func:`stem`, longest first. Each maps to its replacement.
+_SUFFIXES: Tuple[Tuple[str, str], ...] = (
+    ("ational", "ate"),
+    ("ization", "ize"),
+    ("fulness", "ful"),
+    ("iveness", "ive"),
+    ("ically", "ic"),
+    ("ations", "ate"),
+    ("ation", "ate"),
+    ("ments", ""),
+    ("ment", ""),
+    ("ness", ""),
+    ("ical", "ic"),
+    ("ings", ""),
+    ("ing", ""),
+    ("sses", "ss"),
+    ("ies", "y"),
+    ("ied", "y"),
+    ("ed", ""),
+    ("ly", ""),
+    ("s", ""),
+)
+
+MIN_STEM_LENGTH = 3
+
+# Distinct tokens whose stems are remembered; a catalogue repeats a small vocabulary many times.
+STEM_CACHE_SIZE = 1 << 16
+
+# Indexed terms a misspelt query term is expanded to.
+FUZZY_EXPANSIONS = 3
+
+
+@functools.lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(token: str) -> str:
+    """Reduce ``token`` to a crude stem by stripping common English suffixes."""
+
+    if len(token) <= MIN_STEM_LENGTH or token.isdigit():
+        return token
+    for suffix, replacement in _SUFFIXES:
+        if not token.endswith(suffix):
+            continue
+        if suffix == "s" and token.endswith(("ss", "us", "is")):
+            return token
+        stemmed = token[: -len(suffix)] + replacement
+        if len(stemmed) >= MIN_STEM_LENGTH:
+            return stemmed
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lowercase, stemmed tokens without stop words."""
+
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def course_fields(metadata: MetadataRecord, sessions: Iterable[SessionRecord]) -> Iterator[Tuple[str, float]]:
+    """Yield the weighted text fields indexed for a course."""
+
+    yield metadata.title, 3.0
+    yield metadata.description or "", 1.0
+    for topic in metadata.topics:
+        yield topic, 2.0
+    for session in sessions:
+        yield session.title or "", 2.0
+        yield session.tagline or "", 1.0
+        for idea in session.keyIdeas:
+            yield idea, 1.0
+
+
+def document_terms(fields: Iterable[Tuple[str, float]]) -> Tuple[Dict[str, float], float]:
+    """Return the weighted term frequencies and total length of ``fields``."""
+
+    frequencies: Dict[str, float] = {}
+    length = 0.0
+    for text, weight in fields:
+        for token in tokenize(text):
+            frequencies[token] = frequencies.get(token, 0.0) + weight
+            length += weight
+    return frequencies, length
+
+
+def _rank_key(item: Tuple[Hashable, float]) -> Tuple[float, str]:
+    return (-item[1], str(item[0]))
+
+
+def rank(scores: Dict[Hashable, float], limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+    """Order ``scores`` best first, ties by key; with ``limit`` only the top ``limit`` are selected."""
+
+    if limit is None or limit >= len(scores):
+        return sorted(scores.items(), key=_rank_key)
+    top = heapq.nlargest(limit, scores.values())
+    if not top:
+        return []
+    # Keys tied with the last selected score compete for the remaining places by key, as in a full sort.
+    threshold = top[-1]
+    return sorted((item for item in scores.items() if item[1] >= threshold), key=_rank_key)[:limit]
+
+
+class SearchIndex:
+    """Inverted index scoring documents with Okapi BM25.
+
+    Documents are added as weighted text fields so that, for example, a match
+    in a title counts more than one in a long description. Adding a document
+    under an existing key replaces it, which keeps updates incremental.
+
+    Query terms missing from the index are matched against similarly spelt
+    indexed terms (see :class:`.TrigramIndex`), with their score scaled by
+    the similarity, so small typos still find results.
+
+    A query scores every posting of its terms, so its cost grows with the
+    number of matching documents: common terms cost the most.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self._lengths: Dict[Hashable, float] = {}
+        self._total_length = 0.0
+        self._vocabulary = TrigramIndex()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, key: Hashable, fields: Iterable[Tuple[str, float]]) -> None:
+        """Index ``fields`` (``(text, weight)`` pairs) under ``key``."""
+
+        self.add_terms(key, *document_terms(fields))
+
+    def add_terms(self, key: Hashable, frequencies: Dict[str, float], length: float) -> None:
+        """Index precomputed :func:`document_terms` output under ``key``."""
+
+        self.remove(key)
+        for token, frequency in frequencies.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary.add(token)
+            postings[key] = frequency
+        self._terms[key] = tuple(frequencies)
+        self._lengths[key] = length
+        self._total_length += length
+
+    def remove(self, key: Hashable) -> None:
+        """Drop ``key`` from the index if present."""
+
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings[token]
+            del postings[key]
+            if not postings:
+                del self._postings[token]
+                self._vocabulary.remove(token)
+        self._total_length -= self._lengths.pop(key)
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = True) -> List[Tuple[Hashable, float]]:
+        """Return ``(key, score)`` pairs matching ``query``, best first."""
+
+        return rank(self.scores(query, fuzzy), limit)
+
+    def scores(self, query: str, fuzzy: bool = True) -> Dict[Hashable, float]:
+        """Return the BM25 score of every key matching ``query``, unordered."""
+
+        document_count = len(self._lengths)
+        if not document_count:
+            return {}
+        average_length = self._total_length / document_count or 1.0
+
+        scores: Dict[Hashable, float] = {}
+        for token, weight in self._query_terms(query, fuzzy).items():
+            postings = self._postings[token]
+            frequency_count = len(postings)
+            idf = weight * math.log(1.0 + (document_count - frequency_count + 0.5) / (frequency_count + 0.5))
+            for key, frequency in postings.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+        return scores
+
+    def _query_terms(self, query: str, fuzzy: bool) -> Dict[str, float]:
+        """Map each indexed term to search for to its weight (1.0 for exact matches)."""
+
+        terms: Dict[str, float] = {}
+        for token in set(tokenize(query)):
+            if token in self._postings:
+                terms[token] = 1.0
+            elif fuzzy:
+                for term, score in self._vocabulary.similar(token, limit=FUZZY_EXPANSIONS):
+                    terms[term] = max(terms.get(term, 0.0), score)
+        return terms
@@ -0,0 +1,285 @@
+"""Course catalogue published once and shared by every uvicorn worker.
+
+With ``uvicorn --workers N`` every process normally scans, parses and indexes
+its own copy of the catalogue. In shared mode one publisher process
+(``python -m backend.app.publish_catalog``) compiles the data directory into
+numbered snapshot generations (see :mod:`.snapshot`) inside a catalogue
+directory, by default on the ``/dev/shm`` tmpfs, and then points
+``CURRENT`` at the new generation with an atomic rename.
+
+Workers run :class:`SharedCatalogStore` (``COURSES_STORE=shared``). They
+memory-map the current generation, so session data is read from pages that
+all processes share, and they build their lookup indexes from the
+precomputed search terms instead of parsing course files. When ``CURRENT``
+moves, a worker maps the new generation, prepares the records of changed
+courses, and swaps them in under the store lock, so each lookup sees either
+the old catalogue or the new one.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from .models import StoreStats, WarmupReport
+from .records import SessionRecord
+from .snapshot import Snapshot, SnapshotEntry, SnapshotError, compile_snapshot
+from .storage import DEFAULT_SESSION_CACHE_BYTES, CourseRecord, CourseStore, FileSignature, SearchTerms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_DIR = Path("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()) / "courses-catalog"
+# File holding the number of the generation workers should serve.
+POINTER = "CURRENT"
+# Superseded generations kept on disk for workers that have not switched yet.
+KEEP_GENERATIONS = 2
+# Seconds between checks for the first generation while a worker warms up.
+FIRST_GENERATION_POLL = 0.5
+
+_GENERATION_FILE = re.compile(r"catalog-(\d+)\.snapshot")
+
+
+def generation_path(catalog_dir: Path, generation: int) -> Path:
+    return catalog_dir / f"catalog-{generation:08d}.snapshot"
+
+
+def current_generation(catalog_dir: Path) -> Optional[int]:
+    """Return the generation ``CURRENT`` points at, or ``None`` before the first publish."""
+
+    try:
+        text = (catalog_dir / POINTER).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return int(text) if text.isdigit() else None
+
+
+def publish_generation(
+    data_dir: Path, catalog_dir: Path, previous: Optional[Snapshot] = None
+) -> Tuple[int, Snapshot]:
+    """Compile ``data_dir`` as the next generation and make it current.
+
+    The snapshot is complete on disk before ``CURRENT`` is replaced, so a
+    worker never maps a partially written generation. Unchanged courses are
+    copied from ``previous``.
+    """
+
+    catalog_dir.mkdir(parents=True, exist_ok=True)
+    generation = (current_generation(catalog_dir) or 0) + 1
+    snapshot = compile_snapshot(data_dir, generation_path(catalog_dir, generation), previous)
+    pointer = catalog_dir / f"{POINTER}.{os.getpid()}.tmp"
+    pointer.write_text(f"{generation}\n")
+    os.replace(pointer, catalog_dir / POINTER)
+    _prune(catalog_dir, generation)
+    return generation, snapshot
+
+
+def _prune(catalog_dir: Path, generation: int) -> None:
+    # Workers that already mapped a removed generation keep reading it until they switch.
+    for path in catalog_dir.iterdir():
+        match = _GENERATION_FILE.fullmatch(path.name)
+        if match is not None and int(match.group(1)) < generation - KEEP_GENERATIONS:
+            path.unlink(missing_ok=True)
+
+
+def _file_signatures(data_dir: Path) -> Dict[str, FileSignature]:
+    signatures: Dict[str, FileSignature] = {}
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat_result = entry.stat()
+                signatures[entry.name] = (stat_result.st_mtime_ns, stat_result.st_size)
+    return signatures
+
+
+class CatalogPublisher:
+    """Publish a new generation of ``data_dir`` whenever one of its course files changes."""
+
+    def __init__(self, data_dir: Path, catalog_dir: Path) -> None:
+        self.data_dir = data_dir
+        self.catalog_dir = catalog_dir
+        self._published: Optional[Dict[str, FileSignature]] = None
+        self._snapshot: Optional[Snapshot] = None
+        generation = current_generation(catalog_dir)
+        if generation is not None:
+            try:
+                self._snapshot = Snapshot(generation_path(catalog_dir, generation))
+            except SnapshotError as exc:
+                logger.warning("Not reusing catalogue generation %d: %s", generation, exc)
+
+    def publish_if_changed(self) -> Optional[int]:
+        """Publish a generation if the data directory changed; return its number."""
+
+        signatures = _file_signatures(self.data_dir)
+        if signatures == self._published:
+            return None
+        started = time.perf_counter()
+        generation, self._snapshot = publish_generation(self.data_dir, self.catalog_dir, self._snapshot)
+        self._published = signatures
+        logger.info(
+            "Published catalogue generation %d with %d courses in %.2fs",
+            generation,
+            len(self._snapshot.entries),
+            time.perf_counter() - started,
+        )
+        return generation
+
+    def run(self, interval: float) -> None:
+        """Check the data directory every ``interval`` seconds, forever."""
+
+        while True:
+            try:
+                self.publish_if_changed()
+            except (OSError, SnapshotError):
+                logger.exception("Unable to publish the course catalogue to %s", self.catalog_dir)
+            time.sleep(interval)
+
+
+class SharedCatalogStore(CourseStore):
+    """Serve the catalogue generations published to ``catalog_dir``.
+
+    The store never reads course files: only courses in the current
+    generation exist, and ``refresh`` checks ``CURRENT`` instead of the
+    data directory. ``data_dir`` is only used to name the courses' sources.
+    Until the first generation is mapped, ``warm`` keeps waiting for it and
+    lookups answer 503, so a worker never reports an empty catalogue as ready.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        catalog_dir: Path,
+        refresh_interval: float = 0.0,
+        session_cache_bytes: int = DEFAULT_SESSION_CACHE_BYTES,
+    ) -> None:
+        super().__init__(data_dir, refresh_interval=refresh_interval, session_cache_bytes=session_cache_bytes)
+        self.catalog_dir = catalog_dir
+        self.generation = 0
+        self._published_at = 0.0
+        self._reported_unpublished = False
+
+    def _open_published(self) -> Optional[Tuple[int, Snapshot]]:
+        """Map the current generation if it is newer than the one being served."""
+
+        generation = current_generation(self.catalog_dir)
+        if generation is None:
+            if self.generation == 0 and not self._reported_unpublished:
+                logger.warning("No course catalogue has been published to %s yet", self.catalog_dir)
+                self._reported_unpublished = True
+            return None
+        if generation == self.generation:
+            return None
+        try:
+            return generation, Snapshot(generation_path(self.catalog_dir, generation))
+        except SnapshotError as exc:
+            logger.warning("Still serving catalogue generation %d: %s", self.generation, exc)
+            return None
+
+    def warm(self, workers: int = 1) -> WarmupReport:
+        """Wait until a generation is published, then load it like :meth:`CourseStore.warm`."""
+
+        while self.generation == 0:
+            opened = self._open_published()
+            if opened is None:
+                time.sleep(FIRST_GENERATION_POLL)
+                continue
+            with self._lock:
+                self._use(*opened)
+        return super().warm(workers)
+
+    def _published_signatures(self) -> Dict[Path, FileSignature]:
+        if self._snapshot is None:
+            return {}
+        return {self.data_dir / name: entry.signature for name, entry in self._snapshot.entries.items()}
+
+    def _scan(self) -> Tuple[Dict[Path, FileSignature], float]:
+        opened = self._open_published()
+        if opened is not None:
+            with self._lock:
+                self._use(*opened)
+        if self.generation == 0:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="No course catalogue has been published yet",
+            )
+        return self._published_signatures(), self._published_at
+
+    def _use(self, generation: int, snapshot: Snapshot) -> None:
+        """Serve ``snapshot`` from now on; the caller holds ``self._lock``."""
+
+        self.generation = generation
+        self._snapshot = snapshot
+        self._published_at = snapshot.path.stat().st_mtime
+
+    def _refresh(self) -> None:
+        scanned_at = time.monotonic()
+        opened = self._open_published()
+        if opened is None:
+            # Same generation: load any courses not read yet, e.g. while warmup is still running.
+            super()._refresh()
+            return
+        self._switch(*opened)
+        self._scanned_at = scanned_at
+
+    def _switch(self, generation: int, snapshot: Snapshot) -> None:
+        """Prepare the records ``snapshot`` changes, then swap them in under one lock acquisition."""
+
+        with self._lock:
+            current = {path: record.signature for path, record in self._records.items()}
+        loaded = [
+            self._snapshot_record(snapshot, entry, self.data_dir / name)
+            for name, entry in snapshot.entries.items()
+            if current.get(self.data_dir / name) != entry.signature
+        ]
+        with self._lock:
+            self._use(generation, snapshot)
+            pending, removed = self._apply_scan(self._published_signatures(), self._published_at)
+            for record, terms in loaded:
+                self._install(record, terms)
+            self.misses += len(loaded)
+        self._after_load(pending, removed)
+        logger.info("Switched to catalogue generation %d (%d courses changed)", generation, len(loaded))
+
+    def _signature_for(self, path: Path) -> FileSignature:
+        signature = self._signatures.get(path)
+        if signature is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Course file not found: {path.name}",
+            )
+        return signature
+
+    def _load_record(self, path: Path, signature: FileSignature) -> Tuple[CourseRecord, SearchTerms]:
+        snapshot = self._snapshot
+        entry = snapshot.entries.get(path.name) if snapshot is not None else None
+        if snapshot is None or entry is None or entry.signature != signature:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Course file not found: {path.name}",
+            )
+        return self._snapshot_record(snapshot, entry, path)
+
+    def _snapshot_sessions(self, snapshot: Snapshot, entry: SnapshotEntry) -> Callable[[], List[SessionRecord]]:
+        # Read through the generation being served, so records of unchanged
+        # courses do not keep superseded generations mapped.
+        name, signature = entry.name, entry.signature
+        return lambda: self._published_sessions(name, signature)
+
+    def _published_sessions(self, name: str, signature: FileSignature) -> List[SessionRecord]:
+        snapshot = self._snapshot
+        entry = snapshot.entries.get(name) if snapshot is not None else None
+        if snapshot is None or entry is None or entry.signature != signature:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Course file not found: {name}",
+            )
+        return snapshot.sessions(entry)
+
+    def stats(self) -> StoreStats:
+        # Like the SQLite store, report the shared generation so every worker agrees on the version.
+        return super().stats().model_copy(update={"version": self.generation})
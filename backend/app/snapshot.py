@@ -0,0 +1,225 @@
+"""Compiled, memory-mapped snapshot of the course catalogue.
+
+``compile_snapshot`` packs every course file of a data directory into one
+binary file so the API can start without parsing the pretty-printed JSON
+sources. The layout is::
+
+    header   magic, index offset and index length (see ``_HEADER``)
+    blobs    one compact ``listItems`` JSON array per course
+    records  one compact JSON record per course: metadata, prebuilt search
+             terms and session titles
+    index    compact JSON listing every course: file signature, content
+             digest and the location of its blob and record
+
+Only the index is decoded when the snapshot is opened. A course's record
+is decoded when the store loads the course, and its sessions when they
+are first requested; both stay in the memory map otherwise.
+
+Run ``python -m backend.app.compile_snapshot`` to build a snapshot ahead of time.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from .records import MetadataRecord, SessionRecord, decode_course, decode_sessions
+from .search import course_fields, document_terms
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CRSSNAP2"
+_HEADER = struct.Struct("<8sQQ")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or of another format."""
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """Location of one course inside a snapshot."""
+
+    __slots__ = ("name", "signature", "digest", "offset", "size", "record_offset", "record_size")
+
+    name: str
+    signature: Tuple[int, int]
+    digest: str
+    offset: int
+    size: int
+    record_offset: int
+    record_size: int
+
+
+@dataclass(frozen=True)
+class SnapshotCourse:
+    """The decoded record of one course: everything needed to index it without its sessions."""
+
+    metadata: MetadataRecord
+    terms: Dict[str, float]
+    length: float
+    session_titles: List[str]
+
+
+class _CourseRecord(TypedDict):
+    metadata: Dict[str, Any]
+    terms: Dict[str, float]
+    length: float
+    session_titles: List[str]
+
+
+# pydantic's JSON parser shares the short strings repeated across courses, as for course files.
+_record_adapter = TypeAdapter(_CourseRecord)
+
+
+class Snapshot:
+    """Read-only view over a compiled snapshot file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            with path.open("rb") as handle:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            raise SnapshotError(f"Unable to map snapshot {path}: {exc}") from exc
+
+        if len(self._map) < _HEADER.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        magic, index_offset, index_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or index_offset + index_length > len(self._map):
+            raise SnapshotError(f"Snapshot {path} is not a compatible course snapshot")
+        try:
+            index = json.loads(self._map[index_offset : index_offset + index_length])
+        except ValueError as exc:
+            raise SnapshotError(f"Snapshot {path} has a corrupt index: {exc}") from exc
+
+        self.entries: Dict[str, SnapshotEntry] = {}
+        for item in index["courses"]:
+            entry = SnapshotEntry(
+                name=item["name"],
+                signature=(item["signature"][0], item["signature"][1]),
+                digest=item["digest"],
+                offset=item["offset"],
+                size=item["size"],
+                record_offset=item["record_offset"],
+                record_size=item["record_size"],
+            )
+            self.entries[entry.name] = entry
+
+    def session_bytes(self, entry: SnapshotEntry) -> bytes:
+        return self._map[entry.offset : entry.offset + entry.size]
+
+    def record_bytes(self, entry: SnapshotEntry) -> bytes:
+        return self._map[entry.record_offset : entry.record_offset + entry.record_size]
+
+    def course(self, entry: SnapshotEntry, source: Path) -> SnapshotCourse:
+        """Decode the record of ``entry``; nothing decoded is kept by the snapshot."""
+
+        record = _record_adapter.validate_json(self.record_bytes(entry))
+        values = record["metadata"]
+        updated = values.pop("updated", None)
+        values["topics"] = tuple(values.get("topics") or ())
+        metadata = MetadataRecord(
+            **values,
+            updated=datetime.fromisoformat(updated) if updated else None,
+            source=str(source),
+        )
+        return SnapshotCourse(metadata, record["terms"], record["length"], record["session_titles"])
+
+    def sessions(self, entry: SnapshotEntry) -> List[SessionRecord]:
+        return decode_sessions(self.session_bytes(entry))
+
+
+def compile_snapshot(data_dir: Path, target: Path, previous: Optional[Snapshot] = None) -> Snapshot:
+    """Compile every course file in ``data_dir`` into ``target``.
+
+    Entries of ``previous`` whose file signature is unchanged are copied
+    without re-parsing their source. Invalid files are skipped; the store
+    reports them when it falls back to reading the file directly. The
+    snapshot is written to a temporary file and atomically moved into place.
+    """
+
+    temporary = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    index: List[Dict[str, Any]] = []
+    records: List[bytes] = []
+    with temporary.open("wb") as output:
+        output.write(_HEADER.pack(MAGIC, 0, 0))
+        for path in sorted(data_dir.glob("*.json")):
+            stat_result = path.stat()
+            signature = (stat_result.st_mtime_ns, stat_result.st_size)
+            reused = previous.entries.get(path.name) if previous is not None else None
+            if reused is not None and reused.signature == signature:
+                digest, blob, record = reused.digest, previous.session_bytes(reused), previous.record_bytes(reused)
+            else:
+                compiled = _compile_course(path)
+                if compiled is None:
+                    continue
+                digest, blob, record = compiled
+            index.append(
+                {
+                    "name": path.name,
+                    "signature": list(signature),
+                    "digest": digest,
+                    "offset": output.tell(),
+                    "size": len(blob),
+                    "record_size": len(record),
+                }
+            )
+            output.write(blob)
+            records.append(record)
+
+        # Records are packed together so loading them does not fault in the session blobs.
+        for item, record in zip(index, records):
+            item["record_offset"] = output.tell()
+            output.write(record)
+
+        index_bytes = json.dumps({"courses": index}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        index_offset = output.tell()
+        output.write(index_bytes)
+        output.seek(0)
+        output.write(_HEADER.pack(MAGIC, index_offset, len(index_bytes)))
+    os.replace(temporary, target)
+    return Snapshot(target)
+
+
+def _compile_course(path: Path) -> Optional[Tuple[str, bytes, bytes]]:
+    """Return the content digest, sessions blob and record of the course file ``path``."""
+
+    data = path.read_bytes()
+    try:
+        raw = json.loads(data)
+        decoded = decode_course(data, source=str(path), fallback_slug=path.stem)
+    except (ValueError, UnicodeDecodeError) as exc:
+        logger.warning("Leaving %s out of the snapshot: %s", path.name, exc)
+        return None
+    if decoded is None:
+        logger.warning("Leaving %s out of the snapshot: missing listData", path.name)
+        return None
+
+    list_items = raw.get("listItems")
+    if not isinstance(list_items, list):
+        list_items = []
+    metadata, sessions = decoded
+    terms, length = document_terms(course_fields(metadata, sessions))
+    record = {
+        "metadata": metadata.to_model().model_dump(mode="json", exclude={"source"}),
+        "terms": terms,
+        "length": length,
+        "session_titles": [session.title for session in sessions if session.title],
+    }
+    blob = json.dumps(list_items, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return (
+        hashlib.blake2b(data, digest_size=16).hexdigest(),
+        blob,
+        json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+    )
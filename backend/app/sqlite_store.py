@@ -0,0 +1,1029 @@
+"""SQLite-backed course store with FTS5 full-text search."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+from .cache import deep_sizeof
+from .models import (
+    CourseDetail,
+    CourseMetadata,
+    CourseSession,
+    CourseSummary,
+    SessionOutline,
+    StoreStats,
+    Suggestion,
+    WarmupReport,
+    build_detail,
+    build_summary,
+)
+from .facets import FACETS, FacetCounts, FacetFilters, topic_label
+from .metrics import REBUILD_SECONDS
+from .records import MetadataRecord, SessionRecord
+from .responses import CachedBody
+from .search import TOKEN_PATTERN
+from .suggest import KINDS, LAST_CHARACTER, Suggester, normalize, word_suffixes
+from .timing import phase
+from .trigrams import SIMILARITY_THRESHOLD, trigrams
+from .storage import (
+    DEFAULT_SESSION_CACHE_BYTES,
+    DEFAULT_SORT,
+    CoursePage,
+    CourseStore,
+    SUMMARY_FIELDS,
+    FileSignature,
+    cursor_expired,
+    decode_cursor,
+    encode_cursor,
+    json_array,
+    session_not_found,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stored in ``PRAGMA user_version``; databases written by another version are ingested again.
+SCHEMA_VERSION = 4
+
+# Tables dropped and created again when the schema version changes.
+COURSE_TABLES = (
+    "word_trigrams",
+    "words",
+    "phrase_keys",
+    "phrases",
+    "course_search",
+    "topics",
+    "sessions",
+    "courses",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    singleton INTEGER PRIMARY KEY CHECK (singleton = 1),
+    generation INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog (singleton, generation) VALUES (1, 0);
+
+CREATE TABLE IF NOT EXISTS courses (
+    number INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    id TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    file_key TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    updated_key REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS courses_id ON courses (id);
+CREATE INDEX IF NOT EXISTS courses_slug ON courses (slug);
+CREATE INDEX IF NOT EXISTS courses_file_key ON courses (file_key, name);
+CREATE INDEX IF NOT EXISTS courses_title_key ON courses (title_key, file_key, name);
+CREATE INDEX IF NOT EXISTS courses_updated_key ON courses (updated_key, file_key, name);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    course TEXT NOT NULL REFERENCES courses (name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    slug TEXT,
+    title TEXT,
+    rank INTEGER,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (course, position)
+);
+
+CREATE TABLE IF NOT EXISTS topics (
+    course TEXT NOT NULL REFERENCES courses (name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (course, position)
+);
+CREATE INDEX IF NOT EXISTS topics_topic ON topics (topic);
+CREATE INDEX IF NOT EXISTS courses_status ON courses (json_extract(metadata, '$.status'));
+CREATE INDEX IF NOT EXISTS courses_category ON courses (json_extract(metadata, '$.category'));
+CREATE INDEX IF NOT EXISTS courses_year ON courses (json_extract(metadata, '$.year'));
+
+-- Autocomplete phrases, counted once per course title, topic or session title using them.
+-- A course's phrases are read back from its own rows when it is deleted.
+CREATE TABLE IF NOT EXISTS phrases (
+    number INTEGER PRIMARY KEY,
+    normalized TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    kind_rank INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    courses INTEGER NOT NULL,
+    UNIQUE (normalized, kind)
+);
+
+-- Word-suffixes of each phrase; a query completes the phrases with a key it is a prefix of.
+CREATE TABLE IF NOT EXISTS phrase_keys (
+    key TEXT NOT NULL,
+    phrase INTEGER NOT NULL REFERENCES phrases (number) ON DELETE CASCADE,
+    at_start INTEGER NOT NULL,
+    PRIMARY KEY (key, phrase)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS phrase_keys_phrase ON phrase_keys (phrase);
+
+-- Words of the phrases, counted once per phrase, with trigram postings for typo correction.
+CREATE TABLE IF NOT EXISTS words (
+    word TEXT PRIMARY KEY,
+    grams INTEGER NOT NULL,
+    phrases INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS word_trigrams (
+    gram TEXT NOT NULL,
+    word TEXT NOT NULL REFERENCES words (word) ON DELETE CASCADE,
+    PRIMARY KEY (gram, word)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS word_trigrams_word ON word_trigrams (word);
+
+-- Rows share the rowid of their course, so a course's search row is deleted by key.
+CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5(
+    title,
+    description,
+    topics,
+    sessions,
+    tokenize = 'porter unicode61'
+);
+"""
+
+# Column weights for ``bm25()``, in ``course_search`` column order.
+BM25_WEIGHTS = (3.0, 1.0, 2.0, 1.0)
+
+SORT_COLUMNS: Dict[str, str] = {
+    "file": "file_key",
+    "title": "title_key",
+    "updated": "updated_key",
+}
+# Columns breaking ties in every order; ``name`` is unique, so keyset pages never skip a row.
+TIEBREAK_COLUMNS = ("file_key", "name")
+
+# SQL expressions of the scalar facets; ``topics`` is served by the topics table.
+FACET_COLUMNS: Dict[str, str] = {
+    "status": "json_extract(metadata, '$.status')",
+    "category": "json_extract(metadata, '$.category')",
+    "year": "json_extract(metadata, '$.year')",
+}
+
+# Courses without an update date sort before every dated course.
+_UNDATED = -1e300
+
+
+def file_sort_key(stem: str) -> str:
+    """Text key that sorts like :func:`.storage.natural_key` under SQLite's BINARY collation."""
+
+    return re.sub(r"\d+", lambda match: match.group().zfill(20), stem.lower())
+
+
+def fts_query(query: str) -> str:
+    """Translate free text into an FTS5 ``MATCH`` expression.
+
+    Words are OR-ed together, ``"quoted text"`` is matched as a phrase and a
+    trailing ``*`` turns a word into a prefix query.
+    """
+
+    parts: List[str] = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        tokens = TOKEN_PATTERN.findall((phrase or word).lower())
+        if not tokens:
+            continue
+        if phrase:
+            parts.append('"' + " ".join(tokens) + '"')
+            continue
+        parts.extend(f'"{token}"' for token in tokens[:-1])
+        parts.append(f'"{tokens[-1]}"' + ("*" if word.endswith("*") else ""))
+    return " OR ".join(parts)
+
+
+class SQLiteCourseStore(CourseStore):
+    """Serve courses from a SQLite database kept in sync with ``data_dir``.
+
+    Course files are ingested into ``courses``, ``sessions`` and ``topics``
+    tables plus an FTS5 index. Listing, lookups and search run as indexed
+    queries, so the catalogue does not have to fit in memory and several
+    worker processes can share one database file. ``refresh`` re-ingests
+    only files whose modification time or size changed.
+    """
+
+    resident = False
+
+    def __init__(
+        self,
+        data_dir: Path,
+        database_path: Path,
+        refresh_interval: float = 0.0,
+        session_cache_bytes: int = DEFAULT_SESSION_CACHE_BYTES,
+    ) -> None:
+        super().__init__(data_dir, refresh_interval=refresh_interval, session_cache_bytes=session_cache_bytes)
+        self.database_path = database_path
+        self._local = threading.local()
+        self._collisions: Optional[Tuple[int, Dict[str, List[str]]]] = None
+        # File signatures the database matched after the last sync.
+        self._synced: Optional[Dict[str, FileSignature]] = None
+        self._catalogue: Optional[Tuple[int, CachedBody]] = None
+        self._migrate(self._connection())
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30.0)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            self._local.connection = connection
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """Create the schema, dropping tables written by another schema version first.
+
+        The next sync ingests every course again; the catalogue generation
+        keeps counting up, so caches keyed by it stay valid.
+        """
+
+        outdated = connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION
+        if outdated:
+            with connection:
+                for table in COURSE_TABLES:
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+        connection.executescript(SCHEMA)
+        if outdated:
+            with connection:
+                connection.execute("UPDATE catalog SET generation = generation + 1")
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _generation(self) -> int:
+        return self._connection().execute("SELECT generation FROM catalog").fetchone()[0]
+
+    def _refresh(self) -> None:
+        """Ingest added or changed course files and delete removed ones."""
+
+        self._sync(workers=1, phases={})
+
+    def warm(self, workers: int = 1) -> WarmupReport:
+        """Parse changed course files with ``workers`` threads and ingest them."""
+
+        phases: Dict[str, float] = {}
+        bytes_before = self.bytes_read
+        files, loaded, failed = self._flights.do("refresh", lambda: self._sync(workers, phases))
+        started = time.perf_counter()
+        self._prepare()
+        phases["serialize"] = time.perf_counter() - started
+        return WarmupReport(
+            files=files,
+            loaded=loaded,
+            failed=failed,
+            bytes_read=self.bytes_read - bytes_before,
+            phases=phases,
+        )
+
+    def _sync(self, workers: int, phases: Dict[str, float]) -> Tuple[int, int, int]:
+        """Bring the database in line with the data directory.
+
+        Records ``scan``/``load``/``index`` timings in ``phases`` and returns
+        the number of files seen, ingested and skipped as invalid.
+        """
+
+        scanned_at = time.monotonic()
+        started = time.perf_counter()
+        files, directory_mtime = self._scan_names()
+        if files == self._synced and directory_mtime == self._directory_mtime:
+            # Nothing was added, removed or rewritten since the last sync.
+            phases["scan"] = time.perf_counter() - started
+            self._scanned_at = scanned_at
+            return len(files), 0, 0
+        connection = self._connection()
+        stored = {
+            row["name"]: (row["mtime_ns"], row["size"])
+            for row in connection.execute("SELECT name, mtime_ns, size FROM courses")
+        }
+        with self._lock:
+            self._signatures = {self.data_dir / name: signature for name, signature in files.items()}
+            self._directory_mtime = directory_mtime
+            for path in [path for path, (signature, _) in self._failures.items() if files.get(path.name) != signature]:
+                del self._failures[path]
+            failed = {path.name for path in self._failures}
+        changed = [
+            self.data_dir / name
+            for name in sorted(name for name, signature in files.items() if stored.get(name) != signature)
+            if name not in failed
+        ]
+        removed = [name for name in stored if name not in files]
+        signatures = self._signatures
+        phases["scan"] = time.perf_counter() - started
+        if not changed and not removed:
+            self._synced = files
+            self._scanned_at = scanned_at
+            return len(files), 0, 0
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="course-warmup") as pool:
+            results = list(pool.map(lambda path: self._parse_quietly(path, signatures[path]), changed))
+        parsed = [result for result in results if result is not None]
+        removed.extend(path.name for path, result in zip(changed, results) if result is None)
+        phases["load"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with connection:
+            suggestions = SQLiteSuggestions(connection)
+            deleted = removed + [path.name for path, *_ in parsed]
+            suggestions.remove(phrase for name in deleted for phrase in _stored_phrases(connection, name))
+            for name in deleted:
+                self._delete(connection, name)
+            for path, signature, metadata, sessions, digest in parsed:
+                self._insert(connection, path, signature, metadata, sessions, digest)
+            suggestions.add(phrase for _, _, metadata, sessions, _ in parsed for phrase in _phrases(metadata, sessions))
+            connection.execute("UPDATE catalog SET generation = generation + 1")
+        self._report_collisions()
+        self._synced = files
+        self._scanned_at = scanned_at
+        phases["index"] = time.perf_counter() - started
+        REBUILD_SECONDS.observe(phases["index"], "ingest")
+        return len(files), len(parsed), len(changed) - len(parsed)
+
+    def _scan_names(self) -> Tuple[Dict[str, FileSignature], float]:
+        """Like :meth:`_scan`, keyed by file name, so an unchanged directory costs no path objects."""
+
+        files: Dict[str, FileSignature] = {}
+        directory_mtime = self.data_dir.stat().st_mtime
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat_result = entry.stat()
+                    files[entry.name] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return files, directory_mtime
+
+    def _parse_quietly(
+        self, path: Path, signature: FileSignature
+    ) -> Optional[Tuple[Path, FileSignature, MetadataRecord, List[SessionRecord], str]]:
+        try:
+            parsed = self._parse_file(path)
+        except HTTPException as exc:
+            if exc.status_code != status.HTTP_404_NOT_FOUND:
+                logger.warning("Skipping course file %s: %s", path.name, exc.detail)
+                with self._lock:
+                    self._failures[path] = (signature, exc)
+            return None
+        with self._lock:
+            self.misses += 1
+        return (path, signature, *parsed)
+
+    def _delete(self, connection: sqlite3.Connection, name: str) -> None:
+        row = connection.execute("SELECT number FROM courses WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return
+        connection.execute("DELETE FROM course_search WHERE rowid = ?", (row["number"],))
+        connection.execute("DELETE FROM courses WHERE number = ?", (row["number"],))
+
+    def _insert(
+        self,
+        connection: sqlite3.Connection,
+        path: Path,
+        signature: FileSignature,
+        metadata: MetadataRecord,
+        sessions: Sequence[SessionRecord],
+        digest: str,
+    ) -> None:
+        updated = metadata.updated.timestamp() if metadata.updated else _UNDATED
+        model = metadata.to_model()
+        file_key = file_sort_key(path.stem)
+        number = connection.execute(
+            """
+            INSERT INTO courses (
+                name, mtime_ns, size, digest, id, slug, file_key, title_key, updated_key, metadata, summary
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                path.name,
+                signature[0],
+                signature[1],
+                digest,
+                metadata.id,
+                metadata.slug,
+                file_key,
+                metadata.title.casefold(),
+                updated,
+                model.model_dump_json(),
+                build_summary(model).model_dump_json(),
+            ),
+        ).lastrowid
+        connection.executemany(
+            "INSERT INTO sessions (course, position, id, slug, title, rank, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    path.name,
+                    position,
+                    session.id,
+                    session.slug,
+                    session.title,
+                    session.rank,
+                    session.to_model().model_dump_json(),
+                )
+                for position, session in enumerate(sessions)
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO topics (course, position, topic) VALUES (?, ?, ?)",
+            [(path.name, position, topic_label(topic)) for position, topic in enumerate(metadata.topics)],
+        )
+        session_text = "\n".join(
+            "\n".join([session.title or "", session.tagline or "", *session.keyIdeas]) for session in sessions
+        )
+        connection.execute(
+            "INSERT INTO course_search (rowid, title, description, topics, sessions) VALUES (?, ?, ?, ?, ?)",
+            (number, metadata.title, metadata.description or "", "\n".join(metadata.topics), session_text),
+        )
+
+    def stats(self) -> StoreStats:
+        cached = self._connection().execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+        with self._lock:
+            return StoreStats(
+                files=len(self._signatures),
+                cached=cached,
+                hits=self.hits,
+                misses=self.misses,
+                coalesced=self._flights.coalesced,
+                bytes_read=self.bytes_read,
+                version=self._generation(),
+                collisions=self.collisions(),
+                **self._session_cache_stats(),
+            )
+
+    def collisions(self) -> Dict[str, List[str]]:
+        generation = self._generation()
+        with self._lock:
+            cached = self._collisions
+            if cached is not None and cached[0] == generation:
+                return cached[1]
+        rows = self._connection().execute(
+            """
+            SELECT identifier, json_group_array(name) AS names
+            FROM (SELECT id AS identifier, name FROM courses UNION ALL SELECT slug, name FROM courses WHERE slug != id)
+            GROUP BY identifier HAVING COUNT(DISTINCT name) > 1
+            """
+        )
+        collisions = {row["identifier"]: sorted(json.loads(row["names"])) for row in rows}
+        with self._lock:
+            self._collisions = (generation, collisions)
+        return collisions
+
+    def _resolve_name(self, identifier: str) -> str:
+        """Map a file stem, course id or slug to the name of its course file."""
+
+        path = self.data_dir / f"{identifier}.json"
+        with self._lock:
+            failure = self._failures.get(path)
+        if failure is not None:
+            raise failure[1]
+
+        connection = self._connection()
+        with phase("resolve"):
+            row = connection.execute("SELECT name FROM courses WHERE name = ?", (path.name,)).fetchone()
+            if row is None:
+                row = connection.execute(
+                    "SELECT name FROM courses WHERE id = ? OR slug = ? ORDER BY name LIMIT 1",
+                    (identifier, identifier),
+                ).fetchone()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Course '{identifier}' not found",
+            )
+        with self._lock:
+            self.hits += 1
+        return row["name"]
+
+    def _detail(self, name: str) -> CourseDetail:
+        connection = self._connection()
+        with phase("load"):
+            row = connection.execute("SELECT metadata FROM courses WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Course file not found: {name}",
+                )
+            sessions = [
+                CourseSession.model_validate_json(session["payload"])
+                for session in connection.execute(
+                    "SELECT payload FROM sessions WHERE course = ? ORDER BY position", (name,)
+                )
+            ]
+            metadata = CourseMetadata.model_validate_json(row["metadata"])
+        return build_detail(metadata, sessions)
+
+    def list_courses(self) -> List[CourseSummary]:
+        self.refresh()
+        return [
+            CourseSummary.model_validate_json(row["summary"])
+            for row in self._connection().execute("SELECT summary FROM courses ORDER BY file_key, name")
+        ]
+
+    def get_course(self, identifier: str) -> CourseDetail:
+        self.refresh()
+        return self._detail(self._resolve_name(identifier))
+
+    def is_resident(self, identifier: str) -> bool:
+        return False
+
+    def course_body(self, identifier: str) -> CachedBody:
+        self.refresh()
+        return self._detail_body(self._resolve_name(identifier))
+
+    def _detail_body(self, name: str) -> CachedBody:
+        return self._cached(name, "", lambda: self._detail(name).model_dump_json().encode("utf-8"))
+
+    def export_lines(self, since: Optional[datetime] = None) -> Iterator[bytes]:
+        self.refresh()
+        names = [
+            row["name"]
+            for row in self._connection().execute(
+                "SELECT name FROM courses WHERE updated_key >= ? ORDER BY file_key, name",
+                (since.timestamp() if since is not None else _UNDATED,),
+            )
+        ]
+        # Each line is fetched on demand; the iterator may be resumed on any thread.
+        return (self._export_json(name) + b"\n" for name in names)
+
+    def _export_json(self, name: str) -> bytes:
+        row = self._connection().execute("SELECT digest FROM courses WHERE name = ?", (name,)).fetchone()
+        body = self._peek_body((name, row["digest"])) if row is not None else None
+        content = body.rendered if body is not None else None
+        return content if content is not None else self._detail(name).model_dump_json().encode("utf-8")
+
+    def _detail_bytes(self, identifier: str, fields: Optional[Tuple[str, ...]]) -> bytes:
+        name = self._resolve_name(identifier)
+        if fields is None:
+            return self._detail_body(name).content
+        if SUMMARY_FIELDS.issuperset(fields):
+            row = self._connection().execute("SELECT summary FROM courses WHERE name = ?", (name,)).fetchone()
+            summary = CourseSummary.model_validate_json(row["summary"])
+            return summary.model_dump_json(include=set(fields)).encode("utf-8")
+        return self._detail(name).model_dump_json(include=set(fields)).encode("utf-8")
+
+    def outline_body(self, identifier: str) -> CachedBody:
+        self.refresh()
+        name = self._resolve_name(identifier)
+
+        def render() -> bytes:
+            rows = self._connection().execute(
+                "SELECT id, title, rank FROM sessions WHERE course = ? ORDER BY position", (name,)
+            )
+            return json_array(
+                SessionOutline(id=row["id"], title=row["title"], rank=row["rank"]).model_dump_json().encode("utf-8")
+                for row in rows
+            )
+
+        return self._cached(name, "outline", render)
+
+    def session_body(self, identifier: str, session_id: str) -> CachedBody:
+        self.refresh()
+        name = self._resolve_name(identifier)
+        row = self._connection().execute(
+            """
+            SELECT position, payload FROM sessions
+            WHERE course = ? AND (id = ? OR slug = ?)
+            ORDER BY position LIMIT 1
+            """,
+            (name, session_id, session_id),
+        ).fetchone()
+        if row is None:
+            raise session_not_found(identifier, session_id)
+        payload = row["payload"].encode("utf-8")
+        return self._cached(name, str(row["position"]), lambda: payload, sys.getsizeof(payload))
+
+    def _cached(self, name: str, variant: str, render: Callable[[], bytes], retained: int = 0) -> CachedBody:
+        """Return the cached ``variant`` body of course ``name``, valid until its digest changes.
+
+        ``retained`` is the size of what ``render`` holds on to, for the cache budget.
+        """
+
+        row = self._connection().execute("SELECT digest, mtime_ns FROM courses WHERE name = ?", (name,)).fetchone()
+        digest = f"{row['digest']}-{variant}" if variant else row["digest"]
+        return self._shared_body(
+            (name, digest),
+            lambda: (CachedBody(digest, row["mtime_ns"] / 1_000_000_000, render, self._session_cache), retained),
+        )
+
+    def search(self, query: str) -> List[CourseSummary]:
+        self.refresh()
+        return [CourseSummary.model_validate_json(row["summary"]) for row in self._search_rows(query)]
+
+    def _search_rows(self, query: str, sort: Optional[str] = None, filters: FacetFilters = ()) -> List[sqlite3.Row]:
+        expression = self._search_expression(query)
+        if not expression:
+            return []
+        conditions, parameters = _filter_conditions(filters)
+        where = "".join(f" AND {condition}" for condition in conditions)
+        if sort:
+            column = SORT_COLUMNS[sort.lstrip("-")]
+            direction = "DESC" if sort.startswith("-") else "ASC"
+            order = ", ".join(f"courses.{column} {direction}" for column in _order_columns(column))
+        else:
+            order = f"bm25(course_search, {', '.join(map(str, BM25_WEIGHTS))}), courses.file_key, courses.name"
+        return self._connection().execute(
+            f"""
+            SELECT courses.name, courses.summary
+            FROM course_search JOIN courses ON courses.number = course_search.rowid
+            WHERE course_search MATCH ?{where}
+            ORDER BY {order}
+            """,
+            (expression, *parameters),
+        ).fetchall()
+
+    def _search_expression(self, query: str) -> str:
+        """The FTS5 expression searched for ``query``.
+
+        When the query as typed matches no course, misspelt words are replaced
+        by the closest indexed ones; when that matches nothing either, the last
+        word is taken as partly typed and matched as a prefix.
+        """
+
+        expression = fts_query(query)
+        if not expression or self._matches_any(expression):
+            return expression
+        corrected = SQLiteSuggestions(self._connection()).correct(query)
+        if corrected is not None and self._matches_any(fts_query(corrected)):
+            return fts_query(corrected)
+        return fts_query(query + "*")
+
+    def _matches_any(self, expression: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM course_search WHERE course_search MATCH ? LIMIT 1", (expression,)
+        ).fetchone()
+        return row is not None
+
+    def suggest_body(self, query: str, limit: int = 10) -> bytes:
+        self.refresh()
+        suggestions = SQLiteSuggestions(self._connection()).suggest(query, limit)
+        return json_array(suggestion.model_dump_json().encode("utf-8") for suggestion in suggestions)
+
+    def _facet_counts(self, query: Optional[str], filters: FacetFilters) -> FacetCounts:
+        connection = self._connection()
+        search: List[str] = []
+        search_parameters: List[object] = []
+        if query:
+            search = ["courses.number IN (SELECT rowid FROM course_search WHERE course_search MATCH ?)"]
+            search_parameters = [self._search_expression(query) or '""']
+        counts: FacetCounts = {}
+        for facet in FACETS:
+            conditions, parameters = _filter_conditions(tuple(item for item in filters if item[0] != facet))
+            conditions = search + conditions
+            parameters = search_parameters + parameters
+            if facet == "topics":
+                sql = (
+                    "SELECT topic AS value, COUNT(DISTINCT course) AS count"
+                    " FROM topics JOIN courses ON courses.name = topics.course"
+                )
+            else:
+                column = FACET_COLUMNS[facet]
+                sql = f"SELECT {column} AS value, COUNT(*) AS count FROM courses"
+                conditions.append(f"COALESCE({column}, '') != ''")
+            if conditions:
+                sql += f" WHERE {' AND '.join(conditions)}"
+            rows = connection.execute(f"{sql} GROUP BY value ORDER BY value", parameters)
+            counts[facet] = {str(row["value"]): row["count"] for row in rows}
+        return counts
+
+    def _catalogue_body(self) -> CachedBody:
+        generation = self._generation()
+        with self._lock:
+            cached = self._catalogue
+            if cached is not None and cached[0] == generation:
+                self.hits += 1
+                return cached[1]
+        return self._flights.do(("catalogue", generation), lambda: self._build_catalogue_body(generation))
+
+    def _prepare(self) -> None:
+        self._catalogue_body().content
+
+    def _build_catalogue_body(self, generation: int) -> CachedBody:
+        started = time.perf_counter()
+        connection = self._connection()
+        digest = hashlib.blake2b(digest_size=16)
+        for row in connection.execute("SELECT name, digest FROM courses ORDER BY name"):
+            digest.update(f"{row['name']}:{row['digest']}\n".encode("utf-8"))
+        newest = connection.execute("SELECT MAX(mtime_ns) FROM courses").fetchone()[0] or 0
+        body = CachedBody(
+            digest.hexdigest(),
+            max(self._directory_mtime, newest / 1_000_000_000),
+            lambda: json_array(
+                row["summary"].encode("utf-8")
+                for row in self._connection().execute("SELECT summary FROM courses ORDER BY file_key, name")
+            ),
+        )
+        with self._lock:
+            self._catalogue = (generation, body)
+        REBUILD_SECONDS.observe(time.perf_counter() - started, "catalogue")
+        return body
+
+    def list_page(
+        self,
+        query: Optional[str] = None,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        filters: FacetFilters = (),
+    ) -> CoursePage:
+        """Return one page of summaries using keyset pagination over indexed sort columns."""
+
+        self.refresh()
+        if not any((query, sort, cursor, limit, fields, filters)):
+            total = self._connection().execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+            return CoursePage(body=self._catalogue_body(), total=total)
+
+        order = sort or ("relevance" if query else DEFAULT_SORT)
+        if query:
+            rows = self._search_rows(query, sort, filters)
+            total = len(rows)
+            start = 0
+            if cursor:
+                name = decode_cursor(cursor, order)
+                positions = {row["name"]: position for position, row in enumerate(rows)}
+                if name not in positions:
+                    raise cursor_expired()
+                start = positions[name] + 1
+            end = total if limit is None else start + limit
+            page = rows[start:end]
+            has_more = end < total
+        else:
+            page, has_more, total = self._keyset_page(order, cursor, limit, filters)
+
+        next_cursor = encode_cursor(order, page[-1]["name"]) if page and has_more else None
+        summaries = [row["summary"] for row in page]
+        catalogue = self._catalogue_body()
+        digest = hashlib.blake2b(
+            f"{catalogue.etag}|{query}|{order}|{cursor}|{limit}|{fields}|{filters}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        body = self._shared_body(
+            digest,
+            lambda: (
+                CachedBody(
+                    digest,
+                    catalogue.last_modified,
+                    lambda: json_array(_project(summary, fields) for summary in summaries),
+                    self._session_cache,
+                ),
+                deep_sizeof(summaries),
+            ),
+        )
+        return CoursePage(body=body, total=total, next_cursor=next_cursor)
+
+    def _keyset_page(
+        self, order: str, cursor: Optional[str], limit: Optional[int], filters: FacetFilters = ()
+    ) -> Tuple[List[sqlite3.Row], bool, int]:
+        connection = self._connection()
+        columns = _order_columns(SORT_COLUMNS[order.lstrip("-")])
+        descending = order.startswith("-")
+        direction = "DESC" if descending else "ASC"
+        conditions, filter_parameters = _filter_conditions(filters)
+        parameters: List[object] = list(filter_parameters)
+        if cursor:
+            name = decode_cursor(cursor, order)
+            anchor = connection.execute(f"SELECT {', '.join(columns)} FROM courses WHERE name = ?", (name,)).fetchone()
+            if anchor is None:
+                raise cursor_expired()
+            placeholders = ", ".join("?" for _ in columns)
+            conditions.append(f"({', '.join(columns)}) {'<' if descending else '>'} ({placeholders})")
+            parameters.extend(anchor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        parameters.append(-1 if limit is None else limit + 1)
+        rows = connection.execute(
+            f"SELECT name, summary FROM courses {where}"
+            f" ORDER BY {', '.join(f'{column} {direction}' for column in columns)} LIMIT ?",
+            parameters,
+        ).fetchall()
+        count_conditions, count_parameters = _filter_conditions(filters)
+        count_where = f"WHERE {' AND '.join(count_conditions)}" if count_conditions else ""
+        total = connection.execute(f"SELECT COUNT(*) FROM courses {count_where}", count_parameters).fetchone()[0]
+        has_more = limit is not None and len(rows) > limit
+        return rows[:limit] if limit is not None else rows, has_more, total
+
+
+class SQLiteSuggestions(Suggester):
+    """Autocomplete over the ``phrases``, ``phrase_keys`` and ``words`` tables.
+
+    Ranks like :class:`.suggest.SuggestIndex`, so suggestions never need a
+    copy of the catalogue's phrases in memory. :meth:`add` and
+    :meth:`remove` take the phrases of any number of courses, so a sync
+    updates the tables with a few statements, and must run inside the
+    transaction inserting or deleting those courses.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def add(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        """Count ``(text, kind)`` pairs of added courses, indexing new phrases."""
+
+        occurrences, texts = _count_phrases(phrases)
+        if not occurrences:
+            return
+        self.connection.executemany(
+            """
+            INSERT INTO phrases (normalized, kind, kind_rank, text, courses) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (normalized, kind) DO UPDATE SET courses = courses + excluded.courses
+            """,
+            [(*key, KINDS.index(key[1]), texts[key], count) for key, count in occurrences.items()],
+        )
+        rows = self.connection.execute(
+            """
+            SELECT number, normalized, kind, courses FROM phrases
+            WHERE (normalized, kind) IN (
+                SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)
+            )
+            """,
+            (json.dumps(list(occurrences)),),
+        ).fetchall()
+        # A phrase counted only by these courses was created by the upsert above.
+        created = [
+            (number, normalized)
+            for number, normalized, kind, courses in rows
+            if courses == occurrences[(normalized, kind)]
+        ]
+        self.connection.executemany(
+            "INSERT INTO phrase_keys (key, phrase, at_start) VALUES (?, ?, ?)",
+            [
+                (suffix, number, at_start)
+                for number, normalized in created
+                for at_start, suffix in word_suffixes(normalized)
+            ],
+        )
+        words: Dict[str, int] = {}
+        for _, normalized in created:
+            for word in set(normalized.split()):
+                words[word] = words.get(word, 0) + 1
+        self._add_words(words)
+
+    def _add_words(self, words: Dict[str, int]) -> None:
+        """Count ``words`` once per new phrase using them, indexing the trigrams of new words."""
+
+        if not words:
+            return
+        grams = {word: trigrams(word) for word in words}
+        self.connection.executemany(
+            """
+            INSERT INTO words (word, grams, phrases) VALUES (?, ?, ?)
+            ON CONFLICT (word) DO UPDATE SET phrases = phrases + excluded.phrases
+            """,
+            [(word, len(grams[word]), count) for word, count in words.items()],
+        )
+        rows = self.connection.execute(
+            "SELECT word, phrases FROM words WHERE word IN (SELECT value FROM json_each(?))", (json.dumps(list(words)),)
+        )
+        self.connection.executemany(
+            "INSERT INTO word_trigrams (gram, word) VALUES (?, ?)",
+            [(gram, word) for word, count in rows if count == words[word] for gram in grams[word]],
+        )
+
+    def remove(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        """Uncount ``(text, kind)`` pairs of removed courses, dropping phrases no course uses any more."""
+
+        occurrences, _ = _count_phrases(phrases)
+        if not occurrences:
+            return
+        self.connection.executemany(
+            "UPDATE phrases SET courses = courses - ? WHERE normalized = ? AND kind = ?",
+            [(count, *key) for key, count in occurrences.items()],
+        )
+        unused = self.connection.execute(
+            """
+            SELECT number, normalized FROM phrases
+            WHERE courses <= 0 AND (normalized, kind) IN (
+                SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)
+            )
+            """,
+            (json.dumps(list(occurrences)),),
+        ).fetchall()
+        self.connection.executemany("DELETE FROM phrases WHERE number = ?", [(phrase,) for phrase, _ in unused])
+        words = [(word,) for _, normalized in unused for word in set(normalized.split())]
+        self.connection.executemany("UPDATE words SET phrases = phrases - 1 WHERE word = ?", words)
+        self.connection.executemany("DELETE FROM words WHERE word = ? AND phrases <= 0", set(words))
+
+    def _complete(self, prefix: str, limit: int) -> List[Suggestion]:
+        rows = self.connection.execute(
+            """
+            SELECT phrases.text, phrases.kind, phrases.courses
+            FROM phrase_keys JOIN phrases ON phrases.number = phrase_keys.phrase
+            WHERE phrase_keys.key >= ? AND phrase_keys.key < ?
+            GROUP BY phrases.number
+            ORDER BY
+                MAX(phrase_keys.at_start) DESC,
+                phrases.kind_rank,
+                phrases.courses DESC,
+                length(phrases.normalized),
+                phrases.normalized
+            LIMIT ?
+            """,
+            (prefix, prefix + LAST_CHARACTER, limit),
+        )
+        return [Suggestion(text=text, kind=kind, courses=courses) for text, kind, courses in rows]
+
+    def _known(self, word: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM words WHERE word = ?", (word,)).fetchone() is not None
+
+    def _completes(self, prefix: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM phrase_keys WHERE key >= ? AND key < ? LIMIT 1", (prefix, prefix + LAST_CHARACTER)
+        ).fetchone()
+        return row is not None
+
+    def _similar(self, word: str) -> Optional[str]:
+        grams = sorted(trigrams(word))
+        row = self.connection.execute(
+            f"""
+            SELECT words.word, CAST(COUNT(*) AS REAL) / (? + words.grams - COUNT(*)) AS score
+            FROM word_trigrams JOIN words ON words.word = word_trigrams.word
+            WHERE word_trigrams.gram IN ({", ".join("?" for _ in grams)})
+            GROUP BY words.word
+            HAVING score >= ?
+            ORDER BY score DESC, words.word
+            LIMIT 1
+            """,
+            (len(grams), *grams, SIMILARITY_THRESHOLD),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+
+def _count_phrases(
+    phrases: Iterable[Tuple[str, str]]
+) -> Tuple[Dict[Tuple[str, str], int], Dict[Tuple[str, str], str]]:
+    """Occurrences and first display text of each ``(normalized phrase, kind)`` in ``phrases``."""
+
+    occurrences: Dict[Tuple[str, str], int] = {}
+    texts: Dict[Tuple[str, str], str] = {}
+    for text, kind in phrases:
+        normalized = normalize(text)
+        if normalized:
+            occurrences[(normalized, kind)] = occurrences.get((normalized, kind), 0) + 1
+            texts.setdefault((normalized, kind), text.strip())
+    return occurrences, texts
+
+
+def _phrases(metadata: MetadataRecord, sessions: Sequence[SessionRecord]) -> List[Tuple[str, str]]:
+    """The autocomplete ``(text, kind)`` pairs of a course, like :attr:`.storage.CourseRecord.phrases`."""
+
+    return [
+        (metadata.title, "title"),
+        *((topic_label(topic), "topic") for topic in metadata.topics),
+        *((session.title, "session") for session in sessions if session.title),
+    ]
+
+
+def _stored_phrases(connection: sqlite3.Connection, name: str) -> List[Tuple[str, str]]:
+    """:func:`_phrases` of the stored course ``name``, read back from its rows."""
+
+    rows = connection.execute(
+        """
+        SELECT json_extract(metadata, '$.title'), 'title' FROM courses WHERE name = ?
+        UNION ALL SELECT topic, 'topic' FROM topics WHERE course = ?
+        UNION ALL SELECT title, 'session' FROM sessions WHERE course = ? AND title != ''
+        """,
+        (name, name, name),
+    )
+    return [(text, kind) for text, kind in rows]
+
+
+def _order_columns(column: str) -> List[str]:
+    """``column`` followed by the tiebreak columns, without repeating it."""
+
+    return [column, *(tiebreak for tiebreak in TIEBREAK_COLUMNS if tiebreak != column)]
+
+
+def _filter_conditions(filters: FacetFilters) -> Tuple[List[str], List[object]]:
+    """SQL conditions on ``courses`` selecting the rows that match ``filters``."""
+
+    conditions: List[str] = []
+    parameters: List[object] = []
+    for facet, values in filters:
+        placeholders = ", ".join("?" for _ in values)
+        if facet == "topics":
+            conditions.append(f"courses.name IN (SELECT course FROM topics WHERE topic IN ({placeholders}))")
+        else:
+            conditions.append(f"{FACET_COLUMNS[facet]} IN ({placeholders})")
+        parameters.extend(values)
+    return conditions, parameters
+
+
+def _project(summary: str, fields: Optional[Tuple[str, ...]]) -> bytes:
+    if fields is None:
+        return summary.encode("utf-8")
+    return CourseSummary.model_validate_json(summary).model_dump_json(include=set(fields)).encode("utf-8")
+
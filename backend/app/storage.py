@@ -1,116 +1,1145 @@
 """Utilities for loading course JSON files."""
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
-from functools import lru_cache
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Collection, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from fastapi import HTTPException, status
 
-from .models import (
-    CourseDetail,
-    CourseMetadata,
-    CourseSession,
-    CourseSummary,
-    build_detail,
-    build_metadata,
-    build_sessions,
-    build_summary,
-)
+from .cache import ByteBudgetCache, deep_sizeof
+from .facets import FacetCounts, FacetFilters, FacetIndex, topic_label
+from .metrics import DECODE_SECONDS, REBUILD_SECONDS
+from .models import CourseDetail, CourseSummary, SessionOutline, StoreStats, WarmupReport, build_summary
+from .records import CourseDecodeError, MetadataRecord, SessionRecord, decode_course, to_detail
+from .responses import CachedBody
+from .search import SearchIndex, course_fields, document_terms, rank
+from .singleflight import SingleFlight
+from .snapshot import Snapshot, SnapshotEntry, SnapshotError, compile_snapshot
+from .suggest import SuggestIndex, normalize
+from .timing import phase
+
+logger = logging.getLogger(__name__)
+
+# ``(st_mtime_ns, st_size)`` of a course file when it was last parsed.
+FileSignature = Tuple[int, int]
+# Weighted term frequencies and document length fed to the search index.
+SearchTerms = Tuple[Dict[str, float], float]
+SUMMARY_FIELDS = frozenset(CourseSummary.model_fields)
+# Session fields served by the outline endpoint.
+OUTLINE_FIELDS = frozenset(SessionOutline.model_fields)
+
+
+@dataclass(frozen=True)
+class CourseRecord:
+    """Everything known about a single course file.
+
+    Metadata and summary bodies are always resident. Sessions and rendered
+    bodies live in the store's byte-budgeted ``cache``; evicted sessions
+    are decoded again with ``load_sessions``. Metadata and sessions are
+    compact records, converted to API models only to render a body.
+    """
+
+    path: Path
+    signature: FileSignature
+    metadata: MetadataRecord
+    digest: str
+    load_sessions: Callable[[], List[SessionRecord]] = field(repr=False, compare=False)
+    cache: ByteBudgetCache = field(repr=False, compare=False)
+    session_titles: Tuple[str, ...] = field(default=(), repr=False, compare=False)
+
+    @property
+    def _sessions_key(self) -> Tuple[Path, FileSignature, str]:
+        return (self.path, self.signature, "sessions")
+
+    @property
+    def sessions(self) -> List[SessionRecord]:
+        sessions = self.cache.get(self._sessions_key)
+        if sessions is None:
+            with phase("load"):
+                sessions = self.load_sessions()
+            self.cache_sessions(sessions)
+        return sessions
+
+    @property
+    def sessions_resident(self) -> bool:
+        """Whether :attr:`sessions` can be returned without loading them."""
+
+        return self.cache.peek(self._sessions_key) is not None
+
+    def cache_sessions(self, sessions: List[SessionRecord]) -> None:
+        self.cache.put(self._sessions_key, sessions, deep_sizeof(sessions))
+
+    @property
+    def phrases(self) -> List[Tuple[str, str]]:
+        """``(text, kind)`` pairs this course contributes to autocomplete."""
+
+        return [
+            (self.metadata.title, "title"),
+            *((topic_label(topic), "topic") for topic in self.metadata.topics),
+            *((title, "session") for title in self.session_titles),
+        ]
+
+    @property
+    def last_modified(self) -> float:
+        return self.signature[0] / 1_000_000_000
+
+    @property
+    def summary(self) -> CourseSummary:
+        return build_summary(self.metadata.to_model())
+
+    @cached_property
+    def summary_json(self) -> bytes:
+        """UTF-8 JSON body of :attr:`summary`, serialised on first use."""
+
+        return self.summary.model_dump_json().encode("utf-8")
+
+    def summary_for(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """Return :attr:`summary_json`, restricted to ``fields`` when given.
+
+        Projections are kept in :attr:`cache`, so ``fields`` should be in
+        model order for equal selections to share an entry.
+        """
+
+        if fields is None:
+            return self.summary_json
+        key = (self.path, self.signature, "summary", fields)
+        body = self.cache.get(key)
+        if body is None:
+            body = self.summary.model_dump_json(include=set(fields)).encode("utf-8")
+            self.cache.put(key, body, sys.getsizeof(body))
+        return body
+
+    @cached_property
+    def detail(self) -> CachedBody:
+        """Full course detail body, validated by the digest of the source file."""
+
+        return CachedBody(
+            self.digest,
+            self.last_modified,
+            lambda: to_detail(self.metadata, self.sessions).model_dump_json().encode("utf-8"),
+            self.cache,
+        )
+
+    def detail_for(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """Return the detail body, restricted to ``fields`` when given."""
+
+        if fields is None:
+            return self.detail.content
+        if SUMMARY_FIELDS.issuperset(fields):
+            return self.summary_for(fields)
+        key = (self.path, self.signature, fields)
+        body = self.cache.get(key)
+        if body is None:
+            detail = to_detail(self.metadata, self.sessions)
+            body = detail.model_dump_json(include=set(fields)).encode("utf-8")
+            self.cache.put(key, body, sys.getsizeof(body))
+        return body
+
+    def export_json(self) -> bytes:
+        """Detail body for exports, rendered without caching it or the sessions."""
+
+        content = self.detail.rendered
+        if content is not None:
+            return content
+        sessions = self.cache.peek(self._sessions_key)
+        if sessions is None:
+            sessions = self.load_sessions()
+        return to_detail(self.metadata, sessions).model_dump_json().encode("utf-8")
+
+    @cached_property
+    def outline(self) -> CachedBody:
+        """Ids, titles and ranks of every session, in course order."""
+
+        return CachedBody(
+            f"{self.digest}-outline",
+            self.last_modified,
+            lambda: json_array(
+                session.to_model().model_dump_json(include=OUTLINE_FIELDS).encode("utf-8") for session in self.sessions
+            ),
+            self.cache,
+        )
+
+    @cached_property
+    def _session_positions(self) -> Dict[str, int]:
+        positions: Dict[str, int] = {}
+        for position, session in enumerate(self.sessions):
+            positions.setdefault(session.id, position)
+            if session.slug:
+                positions.setdefault(session.slug, position)
+        return positions
+
+    @cached_property
+    def _session_bodies(self) -> Dict[int, CachedBody]:
+        return {}
+
+    def session_body(self, session_id: str) -> Optional[CachedBody]:
+        """Return the body of the session whose id or slug is ``session_id``."""
+
+        position = self._session_positions.get(session_id)
+        if position is None:
+            return None
+        body = self._session_bodies.get(position)
+        if body is None:
+            body = self._session_bodies.setdefault(
+                position,
+                CachedBody(
+                    f"{self.digest}-{position}",
+                    self.last_modified,
+                    lambda: self.sessions[position].to_model().model_dump_json().encode("utf-8"),
+                    self.cache,
+                ),
+            )
+        return body
+
+
+@dataclass(frozen=True)
+class CoursePage:
+    """A page of the course list and the cursor for the page after it."""
+
+    body: CachedBody
+    total: int
+    next_cursor: Optional[str] = None
+
+
+def natural_key(value: str) -> Tuple[Tuple[int, Any], ...]:
+    """Sort key ordering embedded numbers numerically (``2-x`` before ``10-x``)."""
+
+    return tuple((0, int(part)) if part.isdigit() else (1, part.lower()) for part in re.split(r"(\d+)", value) if part)
+
+
+def _file_key(record: CourseRecord) -> Tuple[Tuple[Tuple[int, Any], ...], str]:
+    # The file name breaks ties between stems differing only in case, e.g. ``1-A`` and ``1-a``.
+    return natural_key(record.path.stem), record.path.name
+
+
+def _updated_key(record: CourseRecord) -> Tuple[float, Tuple[Tuple[Tuple[int, Any], ...], str]]:
+    updated = record.metadata.updated
+    return (updated.timestamp() if updated else float("-inf"), _file_key(record))
+
+
+SORT_KEYS: Dict[str, Callable[[CourseRecord], Any]] = {
+    "file": _file_key,
+    "title": lambda record: (record.metadata.title.casefold(), _file_key(record)),
+    "updated": _updated_key,
+}
+DEFAULT_SORT = "file"
+# Words a partly typed last query word is completed to when nothing else matches.
+PREFIX_EXPANSIONS = 10
+# Cached orderings per catalogue version before filtered ones are dropped.
+MAX_CACHED_ORDERINGS = 256
+# Bytes of session lists and rendered bodies kept in memory by default.
+DEFAULT_SESSION_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def encode_cursor(order: str, name: str) -> str:
+    """Return an opaque cursor pointing just after the course file ``name``."""
+
+    return base64.urlsafe_b64encode(f"{order}:{name}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: str) -> str:
+    """Return the file name encoded in ``cursor``, which must belong to ``order``."""
+
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        decoded = ""
+    cursor_order, _, name = decoded.partition(":")
+    if cursor_order != order or not name:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return name
+
+
+def batch_item(identifier: str, course: bytes) -> bytes:
+    """Batch result for a found course, embedding its already encoded body."""
+
+    return b'{"id":%s,"status":200,"course":%s}' % (json.dumps(identifier).encode("utf-8"), course)
+
+
+def batch_error(identifier: str, exc: HTTPException) -> bytes:
+    """Batch result for an identifier that could not be served."""
+
+    return json.dumps(
+        {"id": identifier, "status": exc.status_code, "detail": exc.detail}, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def session_not_found(identifier: str, session_id: str) -> HTTPException:
+    """Error for a session id or slug that a course does not contain."""
+
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Session '{session_id}' not found in course '{identifier}'",
+    )
+
+
+def cursor_expired() -> HTTPException:
+    """Error for a cursor whose course has left the list since it was issued."""
+
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cursor no longer matches the course list; restart from the first page",
+    )
 
 
 class CourseStore:
-    """Load and cache course definitions stored as JSON files."""
+    """Load and cache course definitions stored as JSON files.
+
+    A single store is shared by the whole application. Every public lookup
+    first stats the data directory and only re-parses files whose
+    modification time or size changed since they were cached. Course ids and
+    slugs are indexed as files are loaded so identifier lookups never scan the
+    catalogue.
+
+    When ``snapshot_path`` is given, unchanged courses are loaded from that
+    compiled snapshot (see :mod:`.snapshot`) instead of their JSON files. A
+    snapshot that no longer matches the data directory is rebuilt in the
+    background.
+
+    ``refresh_interval`` throttles the directory scan: within that many
+    seconds of the previous scan, lookups are answered from memory without
+    touching the disk. After that, the catalogue is revalidated in the
+    background while lookups keep being answered from the previous scan;
+    only with an interval of zero, or before the first scan, does a lookup
+    wait for the directory to be read.
+
+    Summaries and indexes are always resident. Session lists and rendered
+    course bodies share a cache of ``session_cache_bytes``, so memory stays
+    bounded however large the catalogue; evicted sessions are read again
+    from their file or the snapshot.
+    """
+
+    # Whether a fresh store answers lookups from memory (see :meth:`fresh`).
+    resident = True
 
-    def __init__(self, data_dir: Path) -> None:
+    def __init__(
+        self,
+        data_dir: Path,
+        snapshot_path: Optional[Path] = None,
+        refresh_interval: float = 0.0,
+        session_cache_bytes: int = DEFAULT_SESSION_CACHE_BYTES,
+    ) -> None:
         self.data_dir = data_dir
         if not self.data_dir.exists():
             raise FileNotFoundError(f"Course data directory does not exist: {self.data_dir}")
+        self.snapshot_path = snapshot_path
+        self.refresh_interval = refresh_interval
+        self._scanned_at = float("-inf")
+        self._snapshot: Optional[Snapshot] = None
+        self._snapshot_rebuilding = False
+        self._revalidating = False
+        self._prepared_version = -1
+        if snapshot_path is not None and snapshot_path.exists():
+            try:
+                self._snapshot = Snapshot(snapshot_path)
+            except SnapshotError as exc:
+                logger.warning("Ignoring course snapshot: %s", exc)
+        self._lock = threading.RLock()
+        self._signatures: Dict[Path, FileSignature] = {}
+        self._records: Dict[Path, CourseRecord] = {}
+        self._failures: Dict[Path, Tuple[FileSignature, HTTPException]] = {}
+        self._identifiers: Dict[str, Set[Path]] = {}
+        self._reported_collisions: Dict[str, List[str]] = {}
+        self._search_index = SearchIndex()
+        self._facets = FacetIndex()
+        self._suggestions = SuggestIndex()
+        self._flights = SingleFlight()
+        self._session_cache = ByteBudgetCache(session_cache_bytes)
+        self._list_body: Optional[Tuple[int, CachedBody]] = None
+        self._orderings: Dict[Tuple[str, FacetFilters], Tuple[int, List[CourseRecord], Dict[Path, int]]] = {}
+        self._directory_mtime = 0.0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
 
     @property
     def json_files(self) -> List[Path]:
         """Return all JSON files sorted alphabetically."""
 
-        return sorted(self.data_dir.glob("*.json"))
+        return sorted(self._signatures)
+
+    def fresh(self) -> bool:
+        """Return whether the last completed refresh is within ``refresh_interval``."""
+
+        return time.monotonic() - self._scanned_at < self.refresh_interval
+
+    def needs_scan(self) -> bool:
+        """Return whether :meth:`refresh` would read the data directory before returning."""
+
+        return not self.fresh() and not (self.refresh_interval > 0 and self._scanned_at > float("-inf"))
+
+    def settled(self) -> bool:
+        """Return whether lookups are answered from memory without a scan or an index rebuild."""
+
+        return self.resident and not self.needs_scan() and self._prepared_version == self.version
+
+    def refresh(self) -> None:
+        """Stat the data directory and reload changed, added or removed files.
+
+        A stale scan is revalidated in the background when :meth:`needs_scan`
+        is false, so the caller is answered from the previous one.
+        """
+
+        if self.fresh() or self._revalidating:
+            return
+        if self.needs_scan():
+            # Concurrent callers share one scan instead of each re-stating the directory.
+            self._flights.do("refresh", self._refresh)
+            return
+        with self._lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+        threading.Thread(target=self._revalidate, name="course-refresh", daemon=True).start()
+
+    def _revalidate(self) -> None:
+        try:
+            self._flights.do("refresh", self._refresh)
+            self._prepare()
+        except Exception:
+            logger.exception("Unable to refresh the course catalogue in %s", self.data_dir)
+        finally:
+            with self._lock:
+                self._revalidating = False
+
+    def _prepare(self) -> None:
+        """Build the orderings in use and the catalogue body of the current version.
+
+        Lookups then find them ready instead of rebuilding them on the
+        request path; see :meth:`settled`.
+        """
+
+        with self._lock:
+            version = self.version
+            sorts = {DEFAULT_SORT, *(sort for sort, filters in self._orderings if not filters)}
+        for sort in sorted(sorts):
+            self._ordering(sort)
+        self._catalogue_body().content
+        with self._lock:
+            self._prepared_version = version
+
+    def _refresh(self) -> None:
+        scanned_at = time.monotonic()
+        signatures, directory_mtime = self._scan()
+        pending, removed = self._apply_scan(signatures, directory_mtime)
+        for path in pending:
+            try:
+                self._record_for(path)
+            except HTTPException:
+                continue
+        self._after_load(pending, removed)
+        self._scanned_at = scanned_at
+
+    def warm(self, workers: int = 1) -> WarmupReport:
+        """Load and index every course file using ``workers`` threads.
+
+        Returns per-phase timings (in seconds) together with the number of
+        files loaded and bytes read, for startup logging.
+        """
+
+        phases: Dict[str, float] = {}
+        bytes_before = self.bytes_read
+        scanned_at = time.monotonic()
+        started = time.perf_counter()
+        signatures, directory_mtime = self._scan()
+        pending, removed = self._apply_scan(signatures, directory_mtime)
+        phases["scan"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="course-warmup") as pool:
+            loaded = [result for result in pool.map(self._load_quietly, pending) if result is not None]
+        phases["load"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with self._lock:
+            for record, terms in loaded:
+                self._install(record, terms)
+        self._after_load(pending, removed)
+        self._scanned_at = scanned_at
+        phases["index"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        self._prepare()
+        phases["serialize"] = time.perf_counter() - started
+
+        return WarmupReport(
+            files=len(signatures),
+            loaded=len(loaded),
+            failed=len(pending) - len(loaded),
+            bytes_read=self.bytes_read - bytes_before,
+            phases=phases,
+        )
+
+    def _apply_scan(
+        self, signatures: Dict[Path, FileSignature], directory_mtime: float
+    ) -> Tuple[List[Path], List[Path]]:
+        """Evict records of changed or removed files; return ``(to_load, removed)``."""
+
+        with self._lock:
+            self._signatures = signatures
+            self._directory_mtime = directory_mtime
+            removed = [path for path, record in self._records.items() if signatures.get(path) != record.signature]
+            for path in removed:
+                self._unindex(self._records.pop(path))
+            for path in [path for path, (signature, _) in self._failures.items() if signatures.get(path) != signature]:
+                del self._failures[path]
+            pending = sorted(path for path in signatures if path not in self._records and path not in self._failures)
+        return pending, removed
+
+    def _after_load(self, pending: List[Path], removed: List[Path]) -> None:
+        if pending or removed:
+            with self._lock:
+                # Merge new autocomplete keys here rather than in the next lookup.
+                self._suggestions.flush()
+        if pending:
+            self._report_collisions()
+        if self.snapshot_path is not None and (pending or removed):
+            self._check_snapshot()
+
+    def _scan(self) -> Tuple[Dict[Path, FileSignature], float]:
+        """Return the signature of every course file and the directory mtime."""
+
+        signatures: Dict[Path, FileSignature] = {}
+        directory_mtime = self.data_dir.stat().st_mtime
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                stat_result = entry.stat()
+                signatures[Path(entry.path)] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return signatures, directory_mtime
+
+    def _check_snapshot(self) -> None:
+        """Rebuild the snapshot in the background if it no longer matches the records."""
 
-    def _read_json(self, path: Path) -> dict:
+        with self._lock:
+            snapshot = self._snapshot
+            if self._snapshot_rebuilding:
+                return
+            if snapshot is not None and _snapshot_matches(snapshot, self._records.values()):
+                return
+            self._snapshot_rebuilding = True
+        threading.Thread(target=self._rebuild_snapshot, args=(snapshot,), daemon=True).start()
+
+    def _rebuild_snapshot(self, previous: Optional[Snapshot]) -> None:
+        assert self.snapshot_path is not None
+        try:
+            snapshot = compile_snapshot(self.data_dir, self.snapshot_path, previous)
+        except (OSError, SnapshotError) as exc:
+            logger.warning("Unable to rebuild course snapshot %s: %s", self.snapshot_path, exc)
+            snapshot = previous
+        else:
+            logger.info("Rebuilt course snapshot %s with %d courses", self.snapshot_path, len(snapshot.entries))
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_rebuilding = False
+
+    def stats(self) -> StoreStats:
+        with self._lock:
+            return StoreStats(
+                files=len(self._signatures),
+                cached=len(self._records),
+                hits=self.hits,
+                misses=self.misses,
+                coalesced=self._flights.coalesced,
+                bytes_read=self.bytes_read,
+                version=self.version,
+                collisions=self.collisions(),
+                **self._session_cache_stats(),
+            )
+
+    def _session_cache_stats(self) -> Dict[str, Any]:
+        cache = self._session_cache
+        return {
+            "session_cache_hits": cache.hits,
+            "session_cache_misses": cache.misses,
+            "session_cache_hit_ratio": cache.hit_ratio,
+            "session_cache_evictions": cache.evictions,
+            "session_cache_bytes": cache.size,
+            "session_cache_budget": cache.budget,
+        }
+
+    def collisions(self) -> Dict[str, List[str]]:
+        """Return ids or slugs that are claimed by more than one course file."""
+
+        with self._lock:
+            return {
+                identifier: sorted(path.name for path in paths)
+                for identifier, paths in self._identifiers.items()
+                if len(paths) > 1
+            }
+
+    def _report_collisions(self) -> None:
+        collisions = self.collisions()
+        for identifier, names in collisions.items():
+            if self._reported_collisions.get(identifier) != names:
+                logger.warning(
+                    "Course identifier %r is claimed by %d files (%s); %s wins lookups",
+                    identifier,
+                    len(names),
+                    ", ".join(names),
+                    names[0],
+                )
+        self._reported_collisions = collisions
+
+    def _index(self, record: CourseRecord, terms: SearchTerms) -> None:
+        self.version += 1
+        for identifier in {record.metadata.id, record.metadata.slug}:
+            self._identifiers.setdefault(identifier, set()).add(record.path)
+        self._search_index.add_terms(record.path, *terms)
+        self._facets.add(record.path, record.metadata)
+        self._suggestions.add(record.phrases)
+
+    def _unindex(self, record: CourseRecord) -> None:
+        self.version += 1
+        for identifier in {record.metadata.id, record.metadata.slug}:
+            paths = self._identifiers.get(identifier)
+            if paths is None:
+                continue
+            paths.discard(record.path)
+            if not paths:
+                del self._identifiers[identifier]
+        self._search_index.remove(record.path)
+        self._facets.remove(record.path, record.metadata)
+        self._suggestions.remove(record.phrases)
+
+    def _signature_for(self, path: Path) -> FileSignature:
+        signature = self._signatures.get(path)
+        if signature is None:
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Course file not found: {path.name}",
+                ) from exc
+            signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        return signature
+
+    def _read_bytes(self, path: Path) -> bytes:
         try:
-            with path.open("r", encoding="utf-8") as handle:
-                return json.load(handle)
+            data = path.read_bytes()
         except FileNotFoundError as exc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Course file not found: {path.name}",
             ) from exc
-        except json.JSONDecodeError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Invalid JSON in {path.name}: {exc.msg}",
-            ) from exc
+        with self._lock:
+            self.bytes_read += len(data)
+        return data
+
+    def _record_for(self, path: Path) -> CourseRecord:
+        signature = self._signature_for(path)
+        with self._lock:
+            record = self._records.get(path)
+            if record is not None and record.signature == signature:
+                self.hits += 1
+                return record
+            failure = self._failures.get(path)
+            if failure is not None and failure[0] == signature:
+                raise failure[1]
+
+        record, terms = self._flights.do(("load", path, signature), lambda: self._load(path, signature))
+        with self._lock:
+            self._install(record, terms)
+        return record
+
+    def _load(self, path: Path, signature: FileSignature) -> Tuple[CourseRecord, SearchTerms]:
+        """Load ``path``, remembering parse failures until the file changes."""
+
+        with self._lock:
+            self.misses += 1
+        try:
+            return self._load_record(path, signature)
+        except HTTPException as exc:
+            if exc.status_code != status.HTTP_404_NOT_FOUND:
+                logger.warning("Skipping course file %s: %s", path.name, exc.detail)
+                with self._lock:
+                    self._failures[path] = (signature, exc)
+            raise
+
+    def _load_quietly(self, path: Path) -> Optional[Tuple[CourseRecord, SearchTerms]]:
+        try:
+            signature = self._signature_for(path)
+            return self._flights.do(("load", path, signature), lambda: self._load(path, signature))
+        except HTTPException:
+            return None
+
+    def _install(self, record: CourseRecord, terms: SearchTerms) -> None:
+        """Make ``record`` visible to lookups; the caller holds ``self._lock``."""
 
-    @lru_cache(maxsize=256)
-    def _metadata_for(self, path: Path) -> CourseMetadata:
-        raw = self._read_json(path)
-        list_data = raw.get("listData") or {}
-        if not list_data:
+        previous = self._records.get(record.path)
+        if previous is record:
+            return
+        if previous is not None:
+            self._unindex(previous)
+        self._records[record.path] = record
+        self._index(record, terms)
+
+    def _load_record(self, path: Path, signature: FileSignature) -> Tuple[CourseRecord, SearchTerms]:
+        snapshot = self._snapshot
+        entry = snapshot.entries.get(path.name) if snapshot is not None else None
+        if snapshot is not None and entry is not None and entry.signature == signature:
+            return self._snapshot_record(snapshot, entry, path)
+
+        metadata, sessions, digest = self._parse_file(path)
+        record = CourseRecord(
+            path=path,
+            signature=signature,
+            metadata=metadata,
+            digest=digest,
+            load_sessions=lambda: self._parse_file(path)[1],
+            cache=self._session_cache,
+            session_titles=tuple(session.title for session in sessions if session.title),
+        )
+        record.cache_sessions(sessions)
+        return record, document_terms(course_fields(metadata, sessions))
+
+    def _snapshot_record(
+        self, snapshot: Snapshot, entry: SnapshotEntry, path: Path
+    ) -> Tuple[CourseRecord, SearchTerms]:
+        """Build the record of ``path`` from its ``entry`` in ``snapshot`` without reading the file."""
+
+        with phase("load"):
+            course = snapshot.course(entry, path)
+        record = CourseRecord(
+            path=path,
+            signature=entry.signature,
+            metadata=course.metadata,
+            digest=entry.digest,
+            load_sessions=self._snapshot_sessions(snapshot, entry),
+            cache=self._session_cache,
+            session_titles=tuple(course.session_titles),
+        )
+        return record, (course.terms, course.length)
+
+    def _snapshot_sessions(self, snapshot: Snapshot, entry: SnapshotEntry) -> Callable[[], List[SessionRecord]]:
+        return lambda: snapshot.sessions(entry)
+
+    def _parse_file(self, path: Path) -> Tuple[MetadataRecord, List[SessionRecord], str]:
+        """Read and decode ``path`` once, returning its metadata, sessions and digest."""
+
+        with phase("load"):
+            data = self._read_bytes(path)
+            started = time.perf_counter()
+            try:
+                decoded = decode_course(data, source=str(path), fallback_slug=path.stem)
+            except CourseDecodeError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Invalid course file {path.name}: {exc}",
+                ) from exc
+        if decoded is None:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail=f"Missing listData in {path.name}",
             )
-        return build_metadata(list_data, source=path, fallback_slug=path.stem)
+        DECODE_SECONDS.observe(time.perf_counter() - started)
+        metadata, sessions = decoded
+        return metadata, sessions, hashlib.blake2b(data, digest_size=16).hexdigest()
 
-    @lru_cache(maxsize=256)
-    def _sessions_for(self, path: Path) -> List[CourseSession]:
-        raw = self._read_json(path)
-        list_items = raw.get("listItems") or []
-        return build_sessions(list_items)
+    def _ordering(self, sort: str, filters: FacetFilters = ()) -> Tuple[List[CourseRecord], Dict[Path, int]]:
+        """Return records matching ``filters`` in ``sort`` order plus each record's position.
+
+        Orders are computed once per catalogue version, so paging through them
+        costs O(page size). Filtered orders select the matching records from
+        the facet bitmaps and keep their position in the unfiltered order.
+        """
+
+        key = (sort, filters)
+        with self._lock:
+            cached = self._orderings.get(key)
+            if cached is not None and cached[0] == self.version:
+                return cached[1], cached[2]
+            version = self.version
+        return self._flights.do(("ordering", key, version), lambda: self._build_ordering(sort, filters, version))
+
+    def _build_ordering(
+        self, sort: str, filters: FacetFilters, version: int
+    ) -> Tuple[List[CourseRecord], Dict[Path, int]]:
+        started = time.perf_counter()
+        if filters:
+            everything, order = self._ordering(sort)
+            with self._lock:
+                matching = self._facets.keys(self._facets.match(filters))
+            records = [everything[index] for index in sorted(order[path] for path in matching if path in order)]
+        else:
+            with self._lock:
+                records = list(self._records.values())
+            records.sort(key=SORT_KEYS[sort.lstrip("-")], reverse=sort.startswith("-"))
+        positions = {record.path: position for position, record in enumerate(records)}
+        with self._lock:
+            if version == self.version:
+                if len(self._orderings) >= MAX_CACHED_ORDERINGS or any(
+                    cached[0] != version for cached in self._orderings.values()
+                ):
+                    self._orderings = {
+                        key: cached
+                        for key, cached in self._orderings.items()
+                        if cached[0] == version and not key[1]
+                    }
+                self._orderings[(sort, filters)] = (version, records, positions)
+        REBUILD_SECONDS.observe(time.perf_counter() - started, "ordering")
+        return records, positions
 
     def list_courses(self) -> List[CourseSummary]:
-        summaries: List[CourseSummary] = []
-        for file_path in self.json_files:
-            try:
-                metadata = self._metadata_for(file_path)
-            except HTTPException:
-                continue
-            summaries.append(build_summary(metadata))
-        return summaries
+        self.refresh()
+        records, _ = self._ordering(DEFAULT_SORT)
+        return [record.summary for record in records]
+
+    def list_body(self) -> CachedBody:
+        """Return the full course list body in natural file order."""
+
+        self.refresh()
+        return self._catalogue_body()
+
+    def _catalogue_body(self) -> CachedBody:
+        """Return the course list body, rebuilt only when the catalogue changes.
+
+        The ETag hashes every file name and content digest so it changes
+        whenever any course is added, edited or removed.
+        """
+
+        with self._lock:
+            cached = self._list_body
+            if cached is not None and cached[0] == self.version:
+                self.hits += 1
+                return cached[1]
+            version = self.version
+        return self._flights.do(("catalogue", version), lambda: self._build_catalogue_body(version))
+
+    def _build_catalogue_body(self, version: int) -> CachedBody:
+        started = time.perf_counter()
+        with self._lock:
+            directory_mtime = self._directory_mtime
+        records, _ = self._ordering(DEFAULT_SORT)
+
+        digest = hashlib.blake2b(digest_size=16)
+        for record in sorted(records, key=lambda record: record.path):
+            digest.update(f"{record.path.name}:{record.digest}\n".encode("utf-8"))
+        body = CachedBody(
+            digest.hexdigest(),
+            max([directory_mtime, *(record.last_modified for record in records)]),
+            lambda: json_array(record.summary_json for record in records),
+        )
+        with self._lock:
+            if version == self.version:
+                self._list_body = (version, body)
+        REBUILD_SECONDS.observe(time.perf_counter() - started, "catalogue")
+        return body
+
+    def list_page(
+        self,
+        query: Optional[str] = None,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        filters: FacetFilters = (),
+    ) -> CoursePage:
+        """Return one page of course summaries.
+
+        Without a ``query`` courses are listed in ``sort`` order (natural file
+        order by default); with one they are ranked by relevance unless
+        ``sort`` is given. ``filters`` keeps only courses with the given facet
+        values. ``fields`` restricts every summary to the named keys.
+        ``cursor`` is the opaque ``next_cursor`` of the previous page.
+        """
+
+        self.refresh()
+        if not any((query, sort, cursor, limit, fields, filters)):
+            body = self._catalogue_body()
+            return CoursePage(body=body, total=len(self._records))
+
+        order = sort or ("relevance" if query else DEFAULT_SORT)
+        if query and not sort and not cursor and limit is not None:
+            # The first page of a ranking only needs the top ``limit`` matches, not all of them sorted.
+            records, total = self._search(query, filters, limit)
+            positions: Dict[Path, int] = {}
+        else:
+            if query:
+                records, positions = self._ranking(query, sort, filters)
+            else:
+                records, positions = self._ordering(order, filters)
+            total = len(records)
+
+        start = 0
+        if cursor:
+            position = positions.get(self.data_dir / decode_cursor(cursor, order))
+            if position is None:
+                raise cursor_expired()
+            start = position + 1
+        end = total if limit is None else start + limit
+        page = records[start:end]
+        next_cursor = encode_cursor(order, page[-1].path.name) if page and end < total else None
+
+        catalogue = self._catalogue_body()
+        digest = hashlib.blake2b(
+            f"{catalogue.etag}|{query}|{order}|{cursor}|{limit}|{fields}|{filters}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        body = self._shared_body(
+            digest,
+            lambda: (
+                CachedBody(
+                    digest,
+                    catalogue.last_modified,
+                    lambda: json_array(record.summary_for(fields) for record in page),
+                    self._session_cache,
+                ),
+                sys.getsizeof(page),
+            ),
+        )
+        return CoursePage(body=body, total=total, next_cursor=next_cursor)
+
+    def facets_body(self, query: Optional[str] = None, filters: FacetFilters = ()) -> CachedBody:
+        """Return the facet counts of the courses matching ``query`` as a JSON object.
+
+        See :meth:`.FacetIndex.counts` for how ``filters`` affect the counts.
+        """
+
+        self.refresh()
+        return self._facets_body(query, filters)
+
+    def _facets_body(self, query: Optional[str], filters: FacetFilters) -> CachedBody:
+        catalogue = self._catalogue_body()
+        digest = hashlib.blake2b(
+            f"{catalogue.etag}|facets|{query}|{filters}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+        def build() -> Tuple[CachedBody, int]:
+            content = json.dumps(
+                self._facet_counts(query, filters), separators=(",", ":"), ensure_ascii=False
+            ).encode("utf-8")
+            return CachedBody(digest, catalogue.last_modified, lambda: content, self._session_cache), 0
+
+        return self._shared_body(digest, build)
+
+    def _shared_body(self, key: Hashable, build: Callable[[], Tuple[CachedBody, int]]) -> CachedBody:
+        """Return the body cached under ``key``, usually its ETag, building it on first use.
+
+        ``build`` returns a new body and the bytes its render function holds
+        on to. Bodies are kept in the byte-budgeted cache, next to their
+        rendered and compressed variants, so an unchanged page is rendered
+        and compressed once rather than on every request.
+        """
+
+        body = self._session_cache.get(("body", key))
+        if body is None:
+            body, retained = build()
+            self._session_cache.put(("body", key), body, sys.getsizeof(body) + sys.getsizeof(vars(body)) + retained)
+        return body
+
+    def _peek_body(self, key: Hashable) -> Optional[CachedBody]:
+        """The body :meth:`_shared_body` keeps under ``key``, if any, without building or reordering it."""
+
+        return self._session_cache.peek(("body", key))
+
+    def _facet_counts(self, query: Optional[str], filters: FacetFilters) -> FacetCounts:
+        with self._lock:
+            within = None
+            if query:
+                within = self._facets.bitmap(self._scores(query))
+            return self._facets.counts(filters, within)
 
     def get_course(self, identifier: str) -> CourseDetail:
+        self.refresh()
+        record = self._record_for(self._resolve_identifier(identifier))
+        return to_detail(record.metadata, record.sessions)
+
+    def course_body(self, identifier: str) -> CachedBody:
+        """Return the detail body of a course, cached until its file changes."""
+
+        self.refresh()
         path = self._resolve_identifier(identifier)
-        metadata = self._metadata_for(path)
-        sessions = self._sessions_for(path)
-        return build_detail(metadata, sessions)
+        return self._record_for(path).detail
+
+    def outline_body(self, identifier: str) -> CachedBody:
+        """Return the session outline body of a course."""
+
+        self.refresh()
+        return self._record_for(self._resolve_identifier(identifier)).outline
+
+    def session_body(self, identifier: str, session_id: str) -> CachedBody:
+        """Return the body of one session of a course, by session id or slug."""
+
+        self.refresh()
+        body = self._record_for(self._resolve_identifier(identifier)).session_body(session_id)
+        if body is None:
+            raise session_not_found(identifier, session_id)
+        return body
+
+    def export_lines(self, since: Optional[datetime] = None) -> Iterator[bytes]:
+        """Return an iterator of NDJSON lines, one course detail per line.
+
+        Courses are exported in natural file order from the catalogue as of
+        this call. With ``since`` only courses updated at or after that time
+        are included. Details are rendered one at a time and not cached, so
+        an export does not grow the store.
+        """
+
+        self.refresh()
+        records, _ = self._ordering(DEFAULT_SORT)
+        if since is not None:
+            threshold = since.timestamp()
+            records = [record for record in records if _updated_key(record)[0] >= threshold]
+        return (record.export_json() + b"\n" for record in records)
+
+    def batch_body(self, identifiers: Sequence[str], fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """Return a JSON array with one result object per identifier.
+
+        Each object carries the requested identifier and a ``status``: the
+        course detail (restricted to ``fields`` when given) for found courses,
+        or an error ``detail`` for identifiers that cannot be served.
+        """
+
+        self.refresh()
+        items = []
+        for identifier in identifiers:
+            try:
+                items.append(batch_item(identifier, self._detail_bytes(identifier, fields)))
+            except HTTPException as exc:
+                items.append(batch_error(identifier, exc))
+        return json_array(items)
+
+    def _detail_bytes(self, identifier: str, fields: Optional[Tuple[str, ...]]) -> bytes:
+        return self._record_for(self._resolve_identifier(identifier)).detail_for(fields)
+
+    def is_resident(self, identifier: str) -> bool:
+        """Return whether a lookup of ``identifier`` can be answered without reading a file.
+
+        The course must be loaded and its sessions still cached. Unknown
+        identifiers count as resident: their ``404`` needs no I/O. Callers
+        should only rely on the result while :meth:`fresh` holds.
+        """
+
+        try:
+            path = self._resolve_identifier(identifier)
+        except HTTPException:
+            return True
+        with self._lock:
+            record = self._records.get(path)
+            if record is None or record.signature != self._signatures.get(path):
+                return False
+        return record.sessions_resident
 
     def _resolve_identifier(self, identifier: str) -> Path:
-        candidate = self.data_dir / f"{identifier}.json"
-        if candidate.exists():
-            return candidate
-
-        for file_path in self.json_files:
-            metadata = self._metadata_for(file_path)
-            if identifier in {metadata.id, metadata.slug}:
-                return file_path
-
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Course '{identifier}' not found",
-        )
+        """Map a file stem, course id or slug to its file.
+
+        File stems take precedence; an id or slug shared by several files
+        resolves to the alphabetically first one (see :meth:`collisions`).
+        """
+
+        with phase("resolve"):
+            candidate = self.data_dir / f"{identifier}.json"
+            if candidate in self._signatures:
+                return candidate
+
+            with self._lock:
+                paths = self._identifiers.get(identifier)
+                if paths:
+                    return min(paths)
+
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Course '{identifier}' not found",
+            )
 
     def search(self, query: str) -> List[CourseSummary]:
-        query_lower = query.lower()
-        results: List[CourseSummary] = []
-        for summary in self.list_courses():
-            haystack = " ".join(
-                [
-                    summary.title or "",
-                    summary.description or "",
-                    " ".join(summary.topics),
-                ]
-            ).lower()
-            if query_lower in haystack:
-                results.append(summary)
-        return results
+        """Return courses matching ``query`` ranked by BM25 relevance."""
+
+        self.refresh()
+        records, _ = self._search(query)
+        return [record.summary for record in records]
+
+    def suggest_body(self, query: str, limit: int = 10) -> bytes:
+        """Return up to ``limit`` autocomplete suggestions for ``query`` as a JSON array."""
+
+        self.refresh()
+        with self._lock:
+            suggestions = self._suggestions.suggest(query, limit)
+        return json_array(suggestion.model_dump_json().encode("utf-8") for suggestion in suggestions)
+
+    def _search(
+        self, query: str, filters: FacetFilters = (), limit: Optional[int] = None
+    ) -> Tuple[List[CourseRecord], int]:
+        """Return the ``limit`` best matches of ``query`` (all when ``None``) and the number of matches."""
+
+        with self._lock:
+            scores = self._scores(query)
+            if filters:
+                allowed = self._facets.match(filters)
+                scores = {path: score for path, score in scores.items() if self._facets.contains(allowed, path)}
+            return [self._records[path] for path, _ in rank(scores, limit)], len(scores)
+
+    def _scores(self, query: str) -> Dict[Path, float]:
+        """BM25 scores of ``query``; the caller holds ``self._lock``.
+
+        When no word matches, not even a similarly spelt one, the last word is
+        taken as partly typed and completed to the words suggestions know
+        instead, so ``"backp"`` finds the courses about backpropagation.
+        """
+
+        scores = self._search_index.scores(query)
+        words = normalize(query).split()
+        if scores or not words:
+            return scores
+        completions = self._suggestions.words_starting(words[-1], PREFIX_EXPANSIONS)
+        return self._search_index.scores(" ".join(completions), fuzzy=False)
+
+    def _ranking(
+        self, query: str, sort: Optional[str], filters: FacetFilters
+    ) -> Tuple[List[CourseRecord], Dict[Path, int]]:
+        """Return every match of ``query`` in relevance (or ``sort``) order plus each record's position.
+
+        Rankings are kept in the byte-budgeted cache for the catalogue
+        version they were computed at, so paging through a search ranks it once.
+        """
+
+        with self._lock:
+            key = ("ranking", self.version, query, sort, filters)
+        cached = self._session_cache.get(key)
+        if cached is not None:
+            return cached
+        return self._flights.do(key, lambda: self._build_ranking(key, query, sort, filters))
+
+    def _build_ranking(
+        self, key: Hashable, query: str, sort: Optional[str], filters: FacetFilters
+    ) -> Tuple[List[CourseRecord], Dict[Path, int]]:
+        started = time.perf_counter()
+        records, _ = self._search(query, filters)
+        if sort:
+            records.sort(key=SORT_KEYS[sort.lstrip("-")], reverse=sort.startswith("-"))
+        positions = {record.path: position for position, record in enumerate(records)}
+        self._session_cache.put(key, (records, positions), sys.getsizeof(records) + sys.getsizeof(positions))
+        REBUILD_SECONDS.observe(time.perf_counter() - started, "ranking")
+        return records, positions
+
+def _snapshot_matches(snapshot: Snapshot, records: Collection[CourseRecord]) -> bool:
+    if len(snapshot.entries) != len(records):
+        return False
+    for record in records:
+        entry = snapshot.entries.get(record.path.name)
+        if entry is None or entry.signature != record.signature:
+            return False
+    return True
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
 
 
 def discover_data_directory(candidate: Optional[str] = None) -> Path:
@@ -0,0 +1,247 @@
+"""Prefix autocomplete over course titles, topics and session titles."""
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .models import Suggestion
+from .search import TOKEN_PATTERN
+from .trigrams import TrigramIndex
+
+# Suggestion kinds, most relevant first.
+KINDS = ("title", "topic", "session")
+
+# Words of a phrase that autocomplete can start matching at.
+MAX_WORD_STARTS = 8
+
+# Completions rank by whether the phrase starts with the query, then by kind.
+_GROUPS = tuple((at_start, kind) for at_start in (True, False) for kind in KINDS)
+
+# Pending keys merged with ``bisect.insort`` rather than by re-sorting the whole list.
+_INSORT_LIMIT = 64
+
+_Key = Tuple[str, str]
+
+# Sorts after every character, so ``prefix + LAST_CHARACTER`` bounds the keys starting with ``prefix``.
+LAST_CHARACTER = chr(0x10FFFF)
+
+
+def normalize(text: str) -> str:
+    """Lowercase ``text`` and collapse it to space-separated words."""
+
+    return " ".join(TOKEN_PATTERN.findall(text.lower()))
+
+
+def word_suffixes(normalized: str) -> Iterator[Tuple[bool, str]]:
+    """``(at phrase start, suffix)`` for the suffixes of a phrase starting at each of its first words."""
+
+    words = normalized.split()
+    for start in range(min(len(words), MAX_WORD_STARTS)):
+        yield start == 0, " ".join(words[start:])
+
+
+class Suggester:
+    """Completion and typo correction on top of four lookups subclasses provide.
+
+    :meth:`_complete` ranks the phrases matching a prefix, :meth:`_known`,
+    :meth:`_completes` and :meth:`_similar` answer questions about the
+    vocabulary of their words.
+    """
+
+    def suggest(self, query: str, limit: int = 10) -> List[Suggestion]:
+        """Return up to ``limit`` completions of ``query``, best first."""
+
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        suggestions = self._complete(prefix, limit)
+        if len(suggestions) < limit:
+            corrected = self.correct(prefix)
+            if corrected is not None:
+                seen = {(suggestion.text, suggestion.kind) for suggestion in suggestions}
+                for suggestion in self._complete(corrected, limit):
+                    if (suggestion.text, suggestion.kind) not in seen and len(suggestions) < limit:
+                        suggestions.append(suggestion)
+        return suggestions
+
+    def correct(self, query: str) -> Optional[str]:
+        """Replace unknown words of ``query`` with the most similar known ones.
+
+        Returns ``None`` when every word is known or nothing similar exists.
+        The last word also counts as known when it is the start of a known
+        word, so partially typed words are not "corrected".
+        """
+
+        words = normalize(query).split()
+        changed = False
+        for index, word in enumerate(words):
+            if self._known(word) or (index == len(words) - 1 and self._completes(word)):
+                continue
+            similar = self._similar(word)
+            if similar is not None:
+                words[index] = similar
+                changed = True
+        return " ".join(words) if changed else None
+
+    def _complete(self, prefix: str, limit: int) -> List[Suggestion]:
+        """Up to ``limit`` phrases with a word starting with the normalized ``prefix``, best first.
+
+        Phrases starting with ``prefix`` come first, then titles before
+        topics before sessions, then phrases used by more courses, shorter
+        phrases and alphabetical order.
+        """
+
+        raise NotImplementedError
+
+    def _known(self, word: str) -> bool:
+        raise NotImplementedError
+
+    def _completes(self, prefix: str) -> bool:
+        """Whether some phrase has a word starting with ``prefix``."""
+
+        raise NotImplementedError
+
+    def _similar(self, word: str) -> Optional[str]:
+        """The known word most similar to ``word``, if any is similar enough."""
+
+        raise NotImplementedError
+
+
+class SuggestIndex(Suggester):
+    """Phrases offered as completions, with a trigram vocabulary for typos.
+
+    A phrase matches when one of its words starts with the query, e.g.
+    ``"retr"`` completes ``"Retrieval Augmented Generation"`` and ``"gen"``
+    completes it too. Lookups bisect sorted lists of word-suffixes of every
+    phrase, one list per rank group (phrase start or later word, times
+    kind), so they cost ``O(log n)`` plus the matches of the groups needed
+    to fill ``limit``. Keys of new phrases are buffered and merged into the
+    lists by :meth:`flush`; keys of removed phrases are deleted in place.
+    When the query has no completion, its words are replaced by the most
+    similar indexed words and looked up again.
+    """
+
+    def __init__(self) -> None:
+        # (normalized phrase, kind) -> [display text, number of courses]
+        self._phrases: Dict[Tuple[str, str], List] = {}
+        self._words = TrigramIndex()
+        # (at phrase start, kind) -> sorted (word-suffix, normalized phrase) keys
+        self._keys: Dict[Tuple[bool, str], List[_Key]] = {group: [] for group in _GROUPS}
+        self._pending: Dict[Tuple[bool, str], List[_Key]] = {group: [] for group in _GROUPS}
+
+    def add(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        """Add ``(text, kind)`` pairs contributed by one course."""
+
+        for text, kind in phrases:
+            normalized = normalize(text)
+            if not normalized:
+                continue
+            entry = self._phrases.get((normalized, kind))
+            if entry is None:
+                self._phrases[(normalized, kind)] = [text.strip(), 1]
+                for word in set(normalized.split()):
+                    self._words.add(word)
+                for group, key in _phrase_keys(normalized, kind):
+                    self._pending[group].append(key)
+            else:
+                entry[1] += 1
+
+    def remove(self, phrases: Iterable[Tuple[str, str]]) -> None:
+        """Remove ``(text, kind)`` pairs previously added for one course."""
+
+        for text, kind in phrases:
+            normalized = normalize(text)
+            entry = self._phrases.get((normalized, kind))
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._phrases[(normalized, kind)]
+                for word in set(normalized.split()):
+                    self._words.remove(word)
+                self.flush()
+                for group, key in _phrase_keys(normalized, kind):
+                    keys = self._keys[group]
+                    index = bisect.bisect_left(keys, key)
+                    if index < len(keys) and keys[index] == key:
+                        del keys[index]
+
+    def flush(self) -> None:
+        """Merge the keys of phrases added since the last flush into the sorted lists."""
+
+        for group, pending in self._pending.items():
+            if not pending:
+                continue
+            keys = self._keys[group]
+            if len(pending) <= _INSORT_LIMIT:
+                for key in pending:
+                    bisect.insort(keys, key)
+            else:
+                # Timsort merges the sorted run and the appended keys in about linear time.
+                keys.extend(pending)
+                keys.sort()
+            pending.clear()
+
+    def _known(self, word: str) -> bool:
+        return word in self._words
+
+    def _similar(self, word: str) -> Optional[str]:
+        similar = self._words.similar(word, limit=1)
+        return similar[0][0] if similar else None
+
+    def _completes(self, prefix: str) -> bool:
+        self.flush()
+        for keys in self._keys.values():
+            index = bisect.bisect_left(keys, (prefix,))
+            if index < len(keys) and keys[index][0].startswith(prefix):
+                return True
+        return False
+
+    def words_starting(self, prefix: str, limit: int) -> List[str]:
+        """Up to ``limit`` indexed words starting with ``prefix``, alphabetically."""
+
+        self.flush()
+        words: Set[str] = set()
+        for keys in self._keys.values():
+            index = bisect.bisect_left(keys, (prefix,))
+            found = 0
+            while found < limit and index < len(keys) and keys[index][0].startswith(prefix):
+                word = keys[index][0].split(" ", 1)[0]
+                words.add(word)
+                found += 1
+                # Skip the other keys starting with ``word`` as a whole word, but not longer words.
+                index = bisect.bisect_left(keys, (word + " " + LAST_CHARACTER,), index)
+        return sorted(words)[:limit]
+
+    def _complete(self, prefix: str, limit: int) -> List[Suggestion]:
+        self.flush()
+        ranked: List[Tuple[str, str]] = []
+        seen: Set[Tuple[str, str]] = set()
+        # Groups are visited in rank order, so only the last one visited is cut short.
+        for group in _GROUPS:
+            kind = group[1]
+            keys = self._keys[group]
+            start = bisect.bisect_left(keys, (prefix,))
+            end = bisect.bisect_left(keys, (prefix + LAST_CHARACTER,), start)
+            matches = {(normalized, kind) for _, normalized in keys[start:end]}.difference(seen)
+            best = heapq.nsmallest(
+                limit - len(ranked),
+                matches,
+                key=lambda phrase: (-self._phrases[phrase][1], len(phrase[0]), phrase[0]),
+            )
+            ranked.extend(best)
+            seen.update(best)
+            if len(ranked) >= limit:
+                break
+        return [
+            Suggestion(text=self._phrases[phrase][0], kind=phrase[1], courses=self._phrases[phrase][1])
+            for phrase in ranked
+        ]
+
+
+def _phrase_keys(normalized: str, kind: str) -> Iterable[Tuple[Tuple[bool, str], _Key]]:
+    """The ``(group, key)`` entries of one phrase: its word-suffixes, up to :data:`MAX_WORD_STARTS`."""
+
+    for at_start, suffix in word_suffixes(normalized):
+        yield (at_start, kind), (suffix, normalized)
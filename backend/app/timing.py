@@ -0,0 +1,109 @@
+"""Per-request phase timings reported in the ``Server-Timing`` header."""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import ContextManager, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Phases reported for every request, in header order.
+PHASES = ("resolve", "load", "build-model", "serialize")
+
+# Set COURSES_SERVER_TIMING=0 to stop sending the header.
+SERVER_TIMING = os.environ.get("COURSES_SERVER_TIMING", "1") != "0"
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("courses_request_timing", default=None)
+_NOT_TIMED = nullcontext()
+
+
+class RequestTiming:
+    """Exclusive time spent in each phase of one request.
+
+    Entering a phase pauses the enclosing one, so a detail body rendered
+    under ``serialize`` that first builds its model charges that part to
+    ``build-model`` only.
+    """
+
+    __slots__ = ("durations", "_stack", "_since")
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._stack: List[str] = []
+        self._since = 0.0
+
+    def enter(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            self.durations[self._stack[-1]] += now - self._since
+        self._stack.append(name)
+        self._since = now
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        self.durations[self._stack.pop()] += now - self._since
+        self._since = now
+
+    def header(self, total: float) -> str:
+        """Render the ``Server-Timing`` value; durations are in milliseconds."""
+
+        metrics = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.durations.items()]
+        metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+class _Phase:
+    __slots__ = ("timing", "name")
+
+    def __init__(self, timing: RequestTiming, name: str) -> None:
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.timing.enter(self.name)
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.timing.exit()
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Charge the enclosed block to ``name`` for the current request, if it is timed."""
+
+    timing = _current.get()
+    if timing is None:
+        return _NOT_TIMED
+    return _Phase(timing, name)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding a ``Server-Timing`` header with the :data:`PHASES` of each request.
+
+    Work the request hands to :class:`.AsyncLoader` threads is included, as
+    the loader runs it in a copy of the request's context.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not SERVER_TIMING:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timing = RequestTiming()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.header(time.perf_counter() - started))
+            await send(message)
+
+        token = _current.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
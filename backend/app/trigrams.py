@@ -0,0 +1,80 @@
+"""Trigram similarity over a vocabulary of words, for typo-tolerant lookups."""
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+# Minimum Jaccard similarity of trigram sets for two words to count as alike.
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    """Return the trigrams of ``word`` padded like PostgreSQL's ``pg_trgm``.
+
+    Two leading spaces and one trailing space make the start of a word
+    weigh more than its end, which suits typos and autocomplete.
+    """
+
+    padded = f"  {word} "
+    return frozenset(padded[index : index + 3] for index in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """Reference-counted vocabulary with trigram postings.
+
+    Words can be added several times (once per course using them) and stay
+    in the index until removed as often.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, word: str) -> None:
+        count = self._counts.get(word, 0)
+        self._counts[word] = count + 1
+        if count:
+            return
+        grams = trigrams(word)
+        self._sizes[word] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(word)
+
+    def remove(self, word: str) -> None:
+        count = self._counts.get(word)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[word] = count - 1
+            return
+        del self._counts[word]
+        del self._sizes[word]
+        for gram in trigrams(word):
+            words = self._postings[gram]
+            words.discard(word)
+            if not words:
+                del self._postings[gram]
+
+    def similar(
+        self, word: str, threshold: float = SIMILARITY_THRESHOLD, limit: int = 5
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` indexed words at least ``threshold`` similar to ``word``, best first."""
+
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scored = []
+        for candidate, count in shared.items():
+            score = count / (len(grams) + self._sizes[candidate] - count)
+            if score >= threshold:
+                scored.append((candidate, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
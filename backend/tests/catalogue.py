@@ -0,0 +1,95 @@
+"""Course files written by the tests into temporary data directories."""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+COURSES: List[Dict[str, Any]] = [
+    {
+        "name": "1-machine-learning.json",
+        "slug": "machine-learning",
+        "title": "Machine Learning Basics",
+        "status": "LIVE",
+        "year": "2024",
+        "cat": "AI",
+        "date": "2024-03-01 10:00:00",
+        "topics": ["1. Supervised Learning", "2. Neural Networks"],
+        "sessions": ["Linear Models", "Gradient Descent"],
+    },
+    {
+        "name": "2-data-engineering.json",
+        "slug": "data-engineering",
+        "title": "Data Engineering Pipelines",
+        "status": "WIP",
+        "year": "2025",
+        "cat": "DATA",
+        "date": "2025-01-15 09:30:00",
+        "topics": ["1. Batch Processing", "2. Streaming"],
+        "sessions": ["Ingestion", "Orchestration", "Data Quality"],
+    },
+    {
+        "name": "3-neural-networks.json",
+        "slug": "neural-networks",
+        "title": "Neural Networks in Practice",
+        "status": "LIVE",
+        "year": "2025",
+        "cat": "AI",
+        "date": "2025-06-20 14:45:00",
+        "topics": ["1. Neural Networks", "2. Training at Scale"],
+        "sessions": ["Backpropagation"],
+    },
+    {
+        "name": "4-vector-search.json",
+        "slug": "vector-search",
+        "title": "Vector Search Systems",
+        "status": "LIVE",
+        "year": "2024",
+        "cat": "DATA",
+        "date": "2024-11-05 08:15:00",
+        "topics": ["1. Embeddings", "2. Streaming"],
+        "sessions": ["Approximate Nearest Neighbours", "Hybrid Retrieval"],
+    },
+]
+
+
+def course_document(course: Dict[str, Any]) -> Dict[str, Any]:
+    """The JSON document of a course file described by an entry of :data:`COURSES`."""
+
+    slug = course["slug"]
+    return {
+        "listData": {
+            "id": slug,
+            "slug": slug,
+            "name": course["title"],
+            "title": course["title"],
+            "status": course["status"],
+            "cat": course["cat"],
+            "year": course["year"],
+            "date": course["date"],
+            "topics": course["topics"],
+            "description": f"About {course['title']}.",
+        },
+        "listItems": [
+            {
+                "id": f"{slug}-{number}",
+                "slug": f"{slug}-{number}",
+                "name": title,
+                "title": title,
+                "description": f"{title} in {course['title']}.",
+                "rank": number,
+            }
+            for number, title in enumerate(course["sessions"], start=1)
+        ],
+    }
+
+
+def write_course(data_dir: Path, course: Dict[str, Any], mtime: Optional[float] = None) -> Path:
+    """Write ``course`` to ``data_dir``; ``mtime`` moves its modification time."""
+
+    path = data_dir / course["name"]
+    path.write_text(json.dumps(course_document(course)), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
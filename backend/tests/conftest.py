@@ -0,0 +1,63 @@
+"""Shared fixtures: a small course data directory and a client of the application."""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import main
+
+from catalogue import COURSES, write_course
+
+
+def wait_ready(client: TestClient, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while client.get("/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            raise AssertionError(f"application not ready: {client.get('/ready').json()}")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path) -> Path:
+    directory = tmp_path / "json"
+    directory.mkdir()
+    # Files are written a minute in the past, so a rewrite always changes their signature.
+    for course in COURSES:
+        write_course(directory, course, mtime=time.time() - 60)
+    return directory
+
+
+@pytest.fixture
+def serve(data_dir: Path, monkeypatch: pytest.MonkeyPatch) -> Callable[[], ContextManager[TestClient]]:
+    """Run the application on ``data_dir`` from the memory store, rescanning on every request.
+
+    Each call of the returned function runs one lifespan of the application.
+    """
+
+    monkeypatch.setenv("COURSES_DATA_DIR", str(data_dir))
+    monkeypatch.setenv("COURSES_STORE", "memory")
+    monkeypatch.delenv("COURSES_SNAPSHOT_PATH", raising=False)
+    monkeypatch.setattr(main, "REFRESH_INTERVAL", 0.0)
+
+    @contextmanager
+    def lifespan() -> Iterator[TestClient]:
+        main.get_store.cache_clear()
+        try:
+            with TestClient(main.app) as test_client:
+                wait_ready(test_client)
+                yield test_client
+        finally:
+            main.get_store.cache_clear()
+
+    return lifespan
+
+
+@pytest.fixture
+def client(serve: Callable[[], ContextManager[TestClient]]) -> Iterator[TestClient]:
+    with serve() as test_client:
+        yield test_client
@@ -0,0 +1,34 @@
+"""Tests for ``POST /courses/batch``."""
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_batch_keeps_request_order_and_reports_missing_ids(client: TestClient) -> None:
+    ids = ["vector-search", "missing", "1-machine-learning", "machine-learning"]
+    response = client.post("/courses/batch", json={"ids": ids})
+    assert response.status_code == 200
+
+    items = response.json()
+    assert [item["id"] for item in items] == ids
+    assert [item["status"] for item in items] == [200, 404, 200, 200]
+    assert items[0]["course"]["slug"] == "vector-search"
+    assert items[1] == {"id": "missing", "status": 404, "detail": "Course 'missing' not found"}
+    # A file stem and a slug resolve to the same course.
+    assert items[2]["course"] == items[3]["course"]
+    assert items[3]["course"] == client.get("/courses/machine-learning").json()
+
+
+def test_batch_selects_fields(client: TestClient) -> None:
+    response = client.post("/courses/batch", json={"ids": ["neural-networks"], "fields": ["slug", "sessions"]})
+    (item,) = response.json()
+    assert set(item["course"]) == {"slug", "sessions"}
+    assert [session["title"] for session in item["course"]["sessions"]] == ["Backpropagation"]
+
+    response = client.post("/courses/batch", json={"ids": ["neural-networks"], "fields": ["nope"]})
+    assert response.status_code == 400
+
+
+def test_batch_rejects_empty_requests(client: TestClient) -> None:
+    assert client.post("/courses/batch", json={"ids": []}).status_code == 422
+    assert client.post("/courses/batch", json={}).status_code == 422
@@ -0,0 +1,84 @@
+"""Tests for :class:`backend.app.cache.ByteBudgetCache`."""
+from __future__ import annotations
+
+from backend.app.cache import ByteBudgetCache
+
+
+def test_size_tracks_entries_and_replacements() -> None:
+    cache = ByteBudgetCache(100)
+    cache.put("a", "first", 10)
+    cache.put("b", "second", 20)
+    assert cache.size == 30
+    assert len(cache) == 2
+
+    cache.put("a", "replaced", 5)
+    assert cache.size == 25
+    assert cache.get("a") == "replaced"
+    assert cache.evictions == 0
+
+
+def test_least_recently_used_entry_is_evicted_first() -> None:
+    cache = ByteBudgetCache(30)
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper(), 10)
+    assert cache.get("a") == "A"
+
+    cache.put("d", "D", 10)
+
+    assert cache.peek("b") is None
+    assert [cache.peek(key) for key in ("a", "c", "d")] == ["A", "C", "D"]
+    assert cache.size == 30
+    assert cache.evictions == 1
+
+
+def test_eviction_frees_enough_bytes_for_a_large_entry() -> None:
+    cache = ByteBudgetCache(30)
+    for key in ("a", "b", "c"):
+        cache.put(key, key, 10)
+
+    cache.put("big", "big", 25)
+
+    assert len(cache) == 1
+    assert cache.size == 25
+    assert cache.evictions == 3
+
+
+def test_peek_does_not_change_recency_or_counters() -> None:
+    cache = ByteBudgetCache(20)
+    cache.put("a", "A", 10)
+    cache.put("b", "B", 10)
+    assert cache.peek("a") == "A"
+
+    cache.put("c", "C", 10)
+
+    assert cache.peek("a") is None
+    assert cache.hits == cache.misses == 0
+
+
+def test_entry_larger_than_the_budget_is_not_kept() -> None:
+    cache = ByteBudgetCache(10)
+    cache.put("a", "small", 5)
+
+    cache.put("a", "huge", 11)
+
+    assert cache.get("a") is None
+    assert cache.size == 0
+    assert len(cache) == 0
+
+
+def test_zero_budget_disables_caching() -> None:
+    cache = ByteBudgetCache(0)
+    cache.put("a", "A", 1)
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_hit_ratio_counts_gets() -> None:
+    cache = ByteBudgetCache(10)
+    assert cache.hit_ratio == 0.0
+    cache.put("a", "A", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_ratio == 2 / 3
@@ -0,0 +1,65 @@
+"""Tests for ``ETag`` / ``If-None-Match`` and ``Last-Modified`` / ``If-Modified-Since`` validation."""
+from __future__ import annotations
+
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from catalogue import COURSES, write_course
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def test_matching_etag_returns_not_modified(client: TestClient) -> None:
+    response = client.get("/courses/machine-learning", headers=IDENTITY)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    repeated = client.get("/courses/machine-learning", headers={**IDENTITY, "If-None-Match": etag})
+    assert repeated.status_code == 304
+    assert repeated.headers["ETag"] == etag
+    assert repeated.content == b""
+
+    assert client.get("/courses/machine-learning", headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get("/courses/machine-learning", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_compressed_etag_validates_the_same_body(client: TestClient) -> None:
+    compressed = client.get("/courses/machine-learning", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    etag = compressed.headers["ETag"]
+    assert etag != client.get("/courses/machine-learning", headers=IDENTITY).headers["ETag"]
+
+    response = client.get("/courses/machine-learning", headers={**IDENTITY, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_if_modified_since_follows_last_modified(client: TestClient) -> None:
+    response = client.get("/courses/machine-learning", headers=IDENTITY)
+    last_modified = response.headers["Last-Modified"]
+    since = parsedate_to_datetime(last_modified).timestamp()
+
+    assert client.get("/courses/machine-learning", headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = formatdate(since - 1, usegmt=True)
+    assert client.get("/courses/machine-learning", headers={"If-Modified-Since": earlier}).status_code == 200
+    assert client.get("/courses/machine-learning", headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+    # If-None-Match takes precedence over If-Modified-Since.
+    headers = {"If-None-Match": '"other"', "If-Modified-Since": last_modified}
+    assert client.get("/courses/machine-learning", headers=headers).status_code == 200
+
+
+def test_changed_course_gets_a_new_validator(client: TestClient, data_dir: Path) -> None:
+    response = client.get("/courses/machine-learning", headers=IDENTITY)
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+    listing_etag = client.get("/courses", headers=IDENTITY).headers["ETag"]
+
+    write_course(data_dir, {**COURSES[0], "title": "Machine Learning Revisited"})
+
+    changed = client.get("/courses/machine-learning", headers={**IDENTITY, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Machine Learning Revisited"
+    assert changed.headers["ETag"] != etag
+    assert client.get("/courses/machine-learning", headers={"If-Modified-Since": last_modified}).status_code == 200
+    assert client.get("/courses", headers={**IDENTITY, "If-None-Match": listing_etag}).status_code == 200
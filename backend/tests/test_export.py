@@ -0,0 +1,42 @@
+"""Tests for ``GET /export.ndjson``."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+
+from catalogue import COURSES, write_course
+
+
+def _export(client: TestClient, **params: str) -> List[Dict[str, Any]]:
+    response = client.get("/export.ndjson", params=params)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert response.text == "" or response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_export_streams_every_course_detail_in_file_order(client: TestClient) -> None:
+    courses = _export(client)
+    assert [course["slug"] for course in courses] == [course["slug"] for course in COURSES]
+    for course in courses:
+        assert course == client.get(f"/courses/{course['slug']}").json()
+
+
+def test_export_since_keeps_courses_updated_at_or_after(client: TestClient) -> None:
+    assert [course["slug"] for course in _export(client, since="2025-01-15T09:30:00")] == [
+        "data-engineering",
+        "neural-networks",
+    ]
+    assert _export(client, since="2030-01-01T00:00:00") == []
+    assert client.get("/export.ndjson", params={"since": "yesterday"}).status_code == 422
+
+
+def test_export_follows_changed_files(client: TestClient, data_dir: Path) -> None:
+    write_course(data_dir, {**COURSES[0], "date": "2026-01-01 00:00:00"})
+    (data_dir / COURSES[2]["name"]).unlink()
+
+    courses = _export(client, since="2025-06-01T00:00:00")
+    assert [course["slug"] for course in courses] == ["machine-learning"]
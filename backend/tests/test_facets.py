@@ -0,0 +1,71 @@
+"""Tests for facet filters on ``GET /courses`` and counts from ``GET /facets``."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+
+from catalogue import COURSES, write_course
+
+
+def _slugs(client: TestClient, **params: Any) -> List[str]:
+    response = client.get("/courses", params={**params, "fields": "slug"})
+    assert response.status_code == 200
+    slugs = [course["slug"] for course in response.json()]
+    assert response.headers["X-Total-Count"] == str(len(slugs))
+    return slugs
+
+
+def _facets(client: TestClient, **params: Any) -> Dict[str, Dict[str, int]]:
+    response = client.get("/facets", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_filters_match_any_value_of_a_facet_and_every_facet(client: TestClient) -> None:
+    assert _slugs(client, category="AI") == ["machine-learning", "neural-networks"]
+    assert _slugs(client, topics="Streaming") == ["data-engineering", "vector-search"]
+    assert _slugs(client, status=["WIP", "LIVE"], year="2024") == ["machine-learning", "vector-search"]
+    assert _slugs(client, category="DATA", status="LIVE") == ["vector-search"]
+    assert _slugs(client, search="streaming", category="DATA") == ["data-engineering", "vector-search"]
+    assert _slugs(client, category="MUSIC") == []
+
+
+def test_counts_cover_the_whole_catalogue(client: TestClient) -> None:
+    assert _facets(client) == {
+        "status": {"LIVE": 3, "WIP": 1},
+        "category": {"AI": 2, "DATA": 2},
+        "year": {"2024": 2, "2025": 2},
+        "topics": {
+            "Batch Processing": 1,
+            "Embeddings": 1,
+            "Neural Networks": 2,
+            "Streaming": 2,
+            "Supervised Learning": 1,
+            "Training at Scale": 1,
+        },
+    }
+
+
+def test_counts_ignore_the_own_filter_of_each_facet(client: TestClient) -> None:
+    facets = _facets(client, status=["WIP", "LIVE"], year="2024")
+    # Every status and year stays selectable; other facets count the filtered courses.
+    assert facets["status"] == {"LIVE": 2}
+    assert facets["year"] == {"2024": 2, "2025": 2}
+    assert facets["category"] == {"AI": 1, "DATA": 1}
+    assert facets["topics"] == {"Embeddings": 1, "Neural Networks": 1, "Streaming": 1, "Supervised Learning": 1}
+
+    facets = _facets(client, search="streaming")
+    assert facets["category"] == {"DATA": 2}
+    assert facets["topics"] == {"Batch Processing": 1, "Embeddings": 1, "Streaming": 2}
+
+
+def test_counts_follow_changed_files(client: TestClient, data_dir: Path) -> None:
+    write_course(data_dir, {**COURSES[1], "status": "LIVE", "cat": "AI"})
+    (data_dir / COURSES[3]["name"]).unlink()
+
+    facets = _facets(client)
+    assert facets["status"] == {"LIVE": 3}
+    assert facets["category"] == {"AI": 3}
+    assert _slugs(client, category="DATA") == []
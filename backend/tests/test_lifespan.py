@@ -0,0 +1,21 @@
+"""Tests for the application lifespan."""
+from __future__ import annotations
+
+from typing import Callable, ContextManager
+
+from fastapi.testclient import TestClient
+
+from backend.app import main
+
+
+def test_application_serves_again_after_a_second_lifespan(serve: Callable[[], ContextManager[TestClient]]) -> None:
+    with serve() as first:
+        assert first.get("/courses").status_code == 200
+        first_loader = main.app.state.loader
+
+    with serve() as second:
+        assert main.app.state.loader is not first_loader
+        response = second.get("/courses", params={"fields": "slug"})
+        assert response.status_code == 200
+        assert len(response.json()) == 4
+        assert second.get("/stats").status_code == 200
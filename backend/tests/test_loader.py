@@ -0,0 +1,138 @@
+"""Tests for :class:`backend.app.loader.AsyncLoader`."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from backend.app.loader import AsyncLoader
+
+
+async def _wait_until(condition, timeout: float = 5.0) -> None:
+    async def poll() -> None:
+        while not condition():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def _blocking_load(release: threading.Event, calls: List[str]):
+    def load(name: str) -> str:
+        calls.append(name)
+        if not release.wait(5.0):
+            raise TimeoutError("never released")
+        return f"loaded {name}"
+
+    return load
+
+
+def test_run_returns_the_result_from_a_loader_thread() -> None:
+    async def scenario() -> None:
+        loader = AsyncLoader(2)
+        try:
+            name = await loader.run(lambda: threading.current_thread().name)
+        finally:
+            loader.shutdown()
+        assert name.startswith("course-loader")
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_shares_one_call_per_key() -> None:
+    async def scenario() -> None:
+        loader = AsyncLoader(4)
+        release = threading.Event()
+        calls: List[str] = []
+        load = _blocking_load(release, calls)
+        try:
+            waiters = [asyncio.ensure_future(loader.coalesce("course", load, "a")) for _ in range(3)]
+            other = asyncio.ensure_future(loader.coalesce("other", load, "b"))
+            await _wait_until(lambda: len(calls) == 2)
+            release.set()
+            assert await asyncio.gather(*waiters) == ["loaded a"] * 3
+            assert await other == "loaded b"
+        finally:
+            loader.shutdown()
+        assert sorted(calls) == ["a", "b"]
+        assert loader._inflight == {}
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call() -> None:
+    async def scenario() -> None:
+        loader = AsyncLoader(2)
+        release = threading.Event()
+        calls: List[str] = []
+        load = _blocking_load(release, calls)
+        try:
+            first = asyncio.ensure_future(loader.coalesce("course", load, "a"))
+            second = asyncio.ensure_future(loader.coalesce("course", load, "a"))
+            await _wait_until(lambda: calls)
+
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            release.set()
+
+            assert await second == "loaded a"
+        finally:
+            loader.shutdown()
+        assert calls == ["a"]
+
+    asyncio.run(scenario())
+
+
+def test_call_finishes_after_every_waiter_is_cancelled() -> None:
+    async def scenario() -> None:
+        loader = AsyncLoader(2)
+        release = threading.Event()
+        calls: List[str] = []
+        load = _blocking_load(release, calls)
+        try:
+            waiter = asyncio.ensure_future(loader.coalesce("course", load, "a"))
+            await _wait_until(lambda: calls)
+            shared = loader._inflight["course"]
+
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert not shared.cancelled()
+            release.set()
+
+            assert await shared == "loaded a"
+            await _wait_until(lambda: "course" not in loader._inflight)
+            # The key is free again, so the next caller starts a new call.
+            assert await loader.coalesce("course", load, "b") == "loaded b"
+        finally:
+            loader.shutdown()
+        assert calls == ["a", "b"]
+
+    asyncio.run(scenario())
+
+
+def test_coalesced_callers_share_an_error() -> None:
+    async def scenario() -> None:
+        loader = AsyncLoader(2)
+        release = threading.Event()
+        started = threading.Event()
+
+        def fail() -> str:
+            started.set()
+            release.wait(5.0)
+            raise LookupError("course file vanished")
+
+        try:
+            waiters = [asyncio.ensure_future(loader.coalesce("course", fail)) for _ in range(2)]
+            await _wait_until(started.is_set)
+            release.set()
+            results = await asyncio.gather(*waiters, return_exceptions=True)
+        finally:
+            loader.shutdown()
+        assert [type(result) for result in results] == [LookupError, LookupError]
+        assert results[0] is results[1]
+        assert loader._inflight == {}
+
+    asyncio.run(scenario())
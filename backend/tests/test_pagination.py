@@ -0,0 +1,92 @@
+"""Tests for cursor pagination, sorting and field selection on ``GET /courses``."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+SLUGS_BY_SORT = {
+    "file": ["machine-learning", "data-engineering", "neural-networks", "vector-search"],
+    "title": ["data-engineering", "machine-learning", "neural-networks", "vector-search"],
+    "updated": ["machine-learning", "vector-search", "data-engineering", "neural-networks"],
+}
+
+
+def _follow(client: TestClient, params: Dict[str, Any]) -> List[str]:
+    """Slugs of every page of ``/courses`` with ``params``, following ``X-Next-Cursor``."""
+
+    slugs: List[str] = []
+    params = {**params, "fields": "slug"}
+    while True:
+        response = client.get("/courses", params=params)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "4"
+        slugs.extend(course["slug"] for course in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert "Link" not in response.headers
+            return slugs
+        assert f"cursor={cursor}" in response.headers["Link"]
+        params["cursor"] = cursor
+
+
+@pytest.mark.parametrize("sort", sorted(SLUGS_BY_SORT))
+@pytest.mark.parametrize("descending", [False, True])
+def test_cursor_pages_walk_the_whole_list_once(client: TestClient, sort: str, descending: bool) -> None:
+    expected = SLUGS_BY_SORT[sort][::-1] if descending else SLUGS_BY_SORT[sort]
+    sort = f"-{sort}" if descending else sort
+
+    assert _follow(client, {"sort": sort, "limit": 1}) == expected
+    assert _follow(client, {"sort": sort, "limit": 3}) == expected
+    assert _follow(client, {"sort": sort}) == expected
+
+
+def test_search_pages_follow_relevance(client: TestClient) -> None:
+    first = client.get("/courses", params={"search": "neural networks", "fields": "slug"}).json()
+    paged: List[Dict[str, Any]] = []
+    params: Dict[str, Any] = {"search": "neural networks", "fields": "slug", "limit": 1}
+    while True:
+        response = client.get("/courses", params=params)
+        paged.extend(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert paged == first
+    assert [course["slug"] for course in first][:1] == ["neural-networks"]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "%%%", "dGl0bGU6"])
+def test_malformed_cursors_are_rejected(client: TestClient, cursor: str) -> None:
+    response = client.get("/courses", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_cursor_of_another_sort_is_rejected(client: TestClient) -> None:
+    cursor = client.get("/courses", params={"sort": "title", "limit": 1}).headers["X-Next-Cursor"]
+    assert client.get("/courses", params={"sort": "updated", "cursor": cursor}).status_code == 400
+
+
+def test_cursor_of_a_deleted_course_asks_to_restart(client: TestClient, data_dir: Path) -> None:
+    cursor = client.get("/courses", params={"limit": 2}).headers["X-Next-Cursor"]
+    (data_dir / "2-data-engineering.json").unlink()
+
+    response = client.get("/courses", params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert "restart from the first page" in response.json()["detail"]
+
+
+def test_fields_select_summary_keys(client: TestClient) -> None:
+    courses = client.get("/courses", params={"fields": "title, slug", "limit": 1}).json()
+    assert courses == [{"slug": "machine-learning", "title": "Machine Learning Basics"}]
+
+    response = client.get("/courses", params={"fields": "slug,secret"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown fields: secret"}
+
+
+def test_invalid_sort_and_limit_are_rejected(client: TestClient) -> None:
+    assert client.get("/courses", params={"sort": "size"}).status_code == 422
+    assert client.get("/courses", params={"limit": 0}).status_code == 422
@@ -0,0 +1,40 @@
+"""Tests for :mod:`backend.app.records`."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from backend.app.records import CourseDecodeError, decode_course, decode_sessions
+
+_ITEMS = [{"id": "s1", "title": "Intro"}, "stray note", None, {"slug": "s2", "name": "Wrap-up"}]
+
+
+def _course(items) -> bytes:
+    return json.dumps({"listData": {"id": "c1", "name": "Course"}, "listItems": items}).encode()
+
+
+def test_entries_that_are_not_objects_are_skipped() -> None:
+    decoded = decode_course(_course(_ITEMS), "c1.json", "c1")
+
+    assert decoded is not None
+    metadata, sessions = decoded
+    assert metadata.id == "c1"
+    assert [session.id for session in sessions] == ["s1", "s2"]
+    assert [session.id for session in decode_sessions(json.dumps(_ITEMS).encode())] == ["s1", "s2"]
+
+
+def test_list_items_that_are_not_a_list_yield_no_sessions() -> None:
+    decoded = decode_course(_course({"id": "s1"}), "c1.json", "c1")
+
+    assert decoded is not None
+    assert decoded[1] == []
+
+
+def test_mistyped_field_in_an_object_entry_is_rejected() -> None:
+    items = ["stray note", {"id": "s1", "title": 5}]
+
+    with pytest.raises(CourseDecodeError, match=r"\$\.listItems\[1\]\.title"):
+        decode_course(_course(items), "c1.json", "c1")
+    with pytest.raises(CourseDecodeError, match=r"\$\[1\]\.title"):
+        decode_sessions(json.dumps(items).encode())
@@ -0,0 +1,45 @@
+"""Tests for ``GET /courses?search=`` with misspelt and partly typed words."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, ContextManager, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def search_client(
+    request: pytest.FixtureRequest,
+    serve: Callable[[], ContextManager[TestClient]],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[TestClient]:
+    monkeypatch.setenv("COURSES_STORE", request.param)
+    monkeypatch.setenv("COURSES_SQLITE_PATH", str(tmp_path / "courses.sqlite3"))
+    with serve() as test_client:
+        yield test_client
+
+
+def _slugs(client: TestClient, search: str) -> List[str]:
+    response = client.get("/courses", params={"search": search, "fields": "slug"})
+    assert response.status_code == 200
+    return [course["slug"] for course in response.json()]
+
+
+def test_misspelt_words_are_corrected(search_client: TestClient) -> None:
+    assert _slugs(search_client, "orchestraton") == ["data-engineering"]
+    assert _slugs(search_client, "machine lern") == ["machine-learning"]
+
+
+def test_partly_typed_last_word_is_completed(search_client: TestClient) -> None:
+    assert _slugs(search_client, "orc") == ["data-engineering"]
+    assert _slugs(search_client, "backp") == ["neural-networks"]
+    assert _slugs(search_client, "hybr") == ["vector-search"]
+    facets = search_client.get("/facets", params={"search": "backp"}).json()
+    assert facets["category"] == {"AI": 1}
+
+
+def test_words_matching_nothing_find_nothing(search_client: TestClient) -> None:
+    assert _slugs(search_client, "zzzz") == []
+    assert search_client.get("/facets", params={"search": "zzzz"}).json()["category"] == {}
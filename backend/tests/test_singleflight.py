@@ -0,0 +1,95 @@
+"""Tests for :class:`backend.app.singleflight.SingleFlight`."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+from backend.app.singleflight import SingleFlight
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.001)
+
+
+def test_waiters_share_the_leaders_result() -> None:
+    flight = SingleFlight()
+    release = threading.Event()
+    calls: List[int] = []
+
+    def load() -> str:
+        calls.append(1)
+        release.wait()
+        return "loaded"
+
+    results: List[str] = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", load))) for _ in range(4)]
+    threads[0].start()
+    _wait_until(lambda: calls)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_until(lambda: flight.coalesced == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["loaded"] * 4
+    assert len(calls) == 1
+
+
+def test_leader_error_propagates_to_every_waiter() -> None:
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+    error = ValueError("broken course file")
+
+    def load() -> str:
+        started.set()
+        release.wait()
+        raise error
+
+    raised: List[BaseException] = []
+
+    def call() -> None:
+        try:
+            flight.do("key", load)
+        except ValueError as exc:
+            raised.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    _wait_until(lambda: flight.coalesced == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert raised == [error] * 3
+
+
+def test_key_is_forgotten_after_an_error() -> None:
+    flight = SingleFlight()
+
+    def fail() -> str:
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "retried") == "retried"
+    assert flight.coalesced == 0
+
+
+def test_different_keys_run_independently() -> None:
+    flight = SingleFlight()
+
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.coalesced == 0
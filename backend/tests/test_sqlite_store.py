@@ -0,0 +1,66 @@
+"""Tests for :class:`backend.app.sqlite_store.SQLiteCourseStore`."""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from backend.app.sqlite_store import SQLiteCourseStore
+
+from catalogue import COURSES, course_document, write_course
+
+
+def _pages(store: SQLiteCourseStore, sort: str, limit: int = 1) -> List[str]:
+    slugs: List[str] = []
+    cursor: Optional[str] = None
+    while True:
+        page = store.list_page(sort=sort, cursor=cursor, limit=limit)
+        slugs.extend(course["slug"] for course in json.loads(page.body.content))
+        if page.next_cursor is None:
+            return slugs
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize("sort", ["file", "-file", "title", "-title", "updated", "-updated"])
+def test_keyset_pages_keep_rows_tied_on_every_sort_key(tmp_path: Path, sort: str) -> None:
+    data_dir = tmp_path / "json"
+    data_dir.mkdir()
+    # Both stems have the same sort key, and the courses share a title and date.
+    for name, slug in (("1-A.json", "upper"), ("1-a.json", "lower"), ("2-b.json", "other")):
+        course = {**COURSES[0], "name": name, "slug": slug}
+        (data_dir / name).write_text(json.dumps(course_document(course)), encoding="utf-8")
+    store = SQLiteCourseStore(data_dir, tmp_path / "courses.sqlite3")
+    store.warm()
+
+    assert sorted(_pages(store, sort)) == ["lower", "other", "upper"]
+    assert _pages(store, sort) == _pages(store, sort, limit=3)
+
+
+def test_suggestions_follow_changes_and_leave_no_rows_behind(tmp_path: Path) -> None:
+    data_dir = tmp_path / "json"
+    data_dir.mkdir()
+    for course in COURSES:
+        write_course(data_dir, course, mtime=time.time() - 60)
+    store = SQLiteCourseStore(data_dir, tmp_path / "courses.sqlite3")
+    store.warm()
+
+    def suggest(query: str) -> List[Tuple[str, str, int]]:
+        return [(item["text"], item["kind"], item["courses"]) for item in json.loads(store.suggest_body(query, 5))]
+
+    assert suggest("neural") == [("Neural Networks in Practice", "title", 1), ("Neural Networks", "topic", 2)]
+    assert suggest("streeming") == [("Streaming", "topic", 2)]
+
+    write_course(data_dir, {**COURSES[2], "topics": ["1. Quantum Gardening"]})
+    store._refresh()
+    assert suggest("neural") == [("Neural Networks in Practice", "title", 1), ("Neural Networks", "topic", 1)]
+    assert suggest("quant") == [("Quantum Gardening", "topic", 1)]
+
+    for path in data_dir.iterdir():
+        path.unlink()
+    store._refresh()
+    connection = store._connection()
+    for table in ("phrases", "phrase_keys", "words", "word_trigrams"):
+        assert connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
@@ -0,0 +1,88 @@
+"""The snapshot, SQLite and shared stores serve the same bodies as :class:`CourseStore`."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pytest
+
+from backend.app.facets import normalize_filters
+from backend.app.shared_catalog import SharedCatalogStore, publish_generation
+from backend.app.snapshot import compile_snapshot
+from backend.app.sqlite_store import SQLiteCourseStore
+from backend.app.storage import CourseStore
+
+from catalogue import COURSES, write_course
+
+
+def _snapshot_store(data_dir: Path, work_dir: Path) -> CourseStore:
+    compile_snapshot(data_dir, work_dir / "courses.snapshot")
+    return CourseStore(data_dir, snapshot_path=work_dir / "courses.snapshot")
+
+
+def _sqlite_store(data_dir: Path, work_dir: Path) -> CourseStore:
+    return SQLiteCourseStore(data_dir, work_dir / "courses.sqlite3")
+
+
+def _shared_store(data_dir: Path, work_dir: Path) -> CourseStore:
+    publish_generation(data_dir, work_dir / "catalog")
+    return SharedCatalogStore(data_dir, work_dir / "catalog")
+
+
+STORES: Dict[str, Callable[[Path, Path], CourseStore]] = {
+    "snapshot": _snapshot_store,
+    "sqlite": _sqlite_store,
+    "shared": _shared_store,
+}
+
+
+def _responses(store: CourseStore) -> Dict[str, bytes]:
+    """The bodies of the lookups every store answers, keyed by a description of the lookup."""
+
+    responses: Dict[str, bytes] = {}
+    for sort in (None, "title", "-updated", "-file"):
+        for query in (None, "neural networks", "streeming"):
+            page = store.list_page(query=query, sort=sort)
+            responses[f"list {sort} {query}"] = page.body.content
+            first = store.list_page(query=query, sort=sort, limit=1, fields=("slug", "title"))
+            responses[f"first {sort} {query} total={first.total}"] = first.body.content
+            if first.next_cursor is not None:
+                second = store.list_page(query=query, sort=sort, limit=1, cursor=first.next_cursor)
+                responses[f"second {sort} {query}"] = second.body.content
+    filters = normalize_filters({"category": ["DATA"], "status": ["LIVE", "WIP"]})
+    responses["filtered"] = store.list_page(filters=filters).body.content
+    responses["facets"] = store.facets_body().content
+    responses["facets filtered"] = store.facets_body("streaming", filters).content
+    responses["suggest"] = store.suggest_body("neu", 5)
+    responses["export"] = b"".join(store.export_lines())
+    responses["batch"] = store.batch_body(["vector-search", "missing", "1-machine-learning"])
+    for course in json.loads(store.list_page().body.content):
+        slug = course["slug"]
+        responses[f"detail {slug}"] = store.course_body(slug).content
+        outline = store.outline_body(slug).content
+        responses[f"outline {slug}"] = outline
+        for session in json.loads(outline):
+            responses[f"session {slug} {session['id']}"] = store.session_body(slug, session["id"]).content
+    return responses
+
+
+def _slugs(store: CourseStore) -> List[str]:
+    return [course["slug"] for course in json.loads(store.list_page().body.content)]
+
+
+@pytest.mark.parametrize("kind", sorted(STORES))
+def test_store_serves_the_bodies_of_the_memory_store(data_dir: Path, tmp_path: Path, kind: str) -> None:
+    memory = CourseStore(data_dir)
+    store = STORES[kind](data_dir, tmp_path)
+    memory.warm()
+    store.warm()
+    assert _responses(store) == _responses(memory)
+
+    write_course(data_dir, {**COURSES[0], "title": "Streaming Machine Learning", "topics": ["1. Streaming"]})
+    (data_dir / COURSES[2]["name"]).unlink()
+    if kind == "shared":
+        publish_generation(data_dir, tmp_path / "catalog")
+
+    assert _slugs(store) == ["machine-learning", "data-engineering", "vector-search"]
+    assert _responses(store) == _responses(memory)
@@ -0,0 +1,61 @@
+"""Tests for :class:`backend.app.suggest.SuggestIndex`."""
+from __future__ import annotations
+
+from backend.app.suggest import SuggestIndex
+
+
+def _texts(index: SuggestIndex, query: str, limit: int = 5):
+    return [(suggestion.text, suggestion.kind) for suggestion in index.suggest(query, limit)]
+
+
+def test_better_ranked_match_after_many_alphabetical_ones_is_returned() -> None:
+    index = SuggestIndex()
+    index.add((f"Machine a{number:03d}", "session") for number in range(100))
+    index.add([("Machine Zeta", "title")])
+
+    assert _texts(index, "machine")[0] == ("Machine Zeta", "title")
+
+
+def test_phrases_starting_with_the_query_rank_first() -> None:
+    index = SuggestIndex()
+    index.add([("Applied Machine Learning", "title"), ("Machine Learning", "session")])
+
+    assert _texts(index, "machine") == [("Machine Learning", "session"), ("Applied Machine Learning", "title")]
+
+
+def test_removed_phrases_stop_matching_and_can_be_added_again() -> None:
+    index = SuggestIndex()
+    course = [("Retrieval Augmented Generation", "title"), ("Vector Stores", "topic")]
+    index.add(course)
+    index.add([("Vector Stores", "topic")])
+    assert _texts(index, "gen") == [("Retrieval Augmented Generation", "title")]
+
+    index.remove(course)
+    assert _texts(index, "gen") == []
+    assert [suggestion.courses for suggestion in index.suggest("vector")] == [1]
+
+    index.add(course)
+    assert _texts(index, "retr") == [("Retrieval Augmented Generation", "title")]
+
+
+def test_flush_merges_small_and_large_batches() -> None:
+    index = SuggestIndex()
+    index.add((f"Topic {number}", "topic") for number in range(200))
+    index.flush()
+    index.add([("Topic extra", "topic")])
+    index.flush()
+
+    keys = [key for keys in index._keys.values() for key in keys]
+    assert len(keys) == 2 * 201
+    assert all(keys == sorted(keys) for keys in index._keys.values())
+    assert _texts(index, "topic ext") == [("Topic extra", "topic")]
+
+
+def test_words_starting_skip_repeated_words_but_not_longer_ones() -> None:
+    index = SuggestIndex()
+    index.add((f"Learn topic {number}", "topic") for number in range(50))
+    index.add([("Learning Paths", "title"), ("Lean Teams", "session"), ("Deep Learning", "title")])
+
+    assert index.words_starting("lea", 10) == ["lean", "learn", "learning"]
+    assert index.words_starting("lea", 2) == ["lean", "learn"]
+    assert index.words_starting("xyz", 10) == []
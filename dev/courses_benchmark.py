@@ -0,0 +1,329 @@
+"""Load-test the API against synthetic catalogues and save the results as JSON.
+
+For every catalogue size the harness generates a data directory with
+``courses_generate.py``, starts ``backend.app.main:app`` under uvicorn on it,
+waits for ``/ready`` and then drives the list, detail and search endpoints at
+each concurrency level::
+
+    python3 dev/courses_benchmark.py --sizes 100,10000 --store sqlite --output bench.json
+
+With ``--store shared`` the harness first publishes the catalogue as a
+generation the server maps, and reports how long publishing took.
+
+Each run reports requests per second, p50/p95/p99 latency and the server's
+resident memory. Load is generated by ``--processes`` worker processes, each
+running an asyncio loop with an even share of the concurrency, so a single
+client process does not cap throughput. Requires ``httpx``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:  # httpx is only needed to run benchmarks, not to serve the API.
+    import httpx
+except ImportError:  # pragma: no cover - depends on the environment
+    httpx = None
+
+import courses_generate
+
+# The repository root, so the harness and its server import the application wherever they are run from.
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.app.shared_catalog import publish_generation  # noqa: E402
+
+DEFAULT_SIZES = (100, 10_000, 100_000)
+DEFAULT_CONCURRENCY = (1, 16, 64)
+SCENARIOS = ("list", "detail", "search")
+LIST_PAGE_SIZE = 100
+SEARCH_PAGE_SIZE = 20
+# Identifiers and search terms sampled from the catalogue for each run.
+SAMPLE_SIZE = 1000
+READY_TIMEOUT = float(os.environ.get("COURSES_BENCH_READY_TIMEOUT", "900"))
+
+_WORD = re.compile(r"[A-Za-z]{4,}")
+
+
+def build_catalogue(target: Path, size: int, seed: int) -> Path:
+    """Fill ``target`` with ``size`` synthetic courses from :mod:`courses_generate`.
+
+    An existing ``target`` with the right number of files is reused.
+    """
+
+    if target.is_dir() and sum(1 for _ in target.glob("*.json")) == size:
+        return target
+    shutil.rmtree(target, ignore_errors=True)
+    courses_generate.main(size, str(target), seed=seed)
+    return target
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of process ``pid``, or ``None`` where it cannot be read."""
+
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(pid).memory_info().rss
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of the already sorted ``ordered``."""
+
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """``backend.app.main:app`` running under uvicorn in a child process."""
+
+    def __init__(self, data_dir: Path, store: str, workdir: Path) -> None:
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        env = {
+            **os.environ,
+            "COURSES_DATA_DIR": str(data_dir),
+            "COURSES_STORE": store,
+            "COURSES_SQLITE_PATH": str(workdir / f"{data_dir.name}.sqlite3"),
+            "COURSES_CATALOG_DIR": str(workdir / f"{data_dir.name}.catalog"),
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+        }
+        env.pop("COURSES_SNAPSHOT_PATH", None)
+        command = [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(self.port)]
+        self.process = subprocess.Popen([*command, "--log-level", "warning"], env=env)
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT) -> float:
+        """Block until ``/ready`` answers 200 and return how long that took."""
+
+        started = time.perf_counter()
+        with httpx.Client(base_url=self.url, timeout=10.0) as client:
+            while time.perf_counter() - started < timeout:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"Server exited with status {self.process.returncode}")
+                try:
+                    if client.get("/ready").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.1)
+        raise TimeoutError(f"Server not ready after {timeout:.0f}s")
+
+    @property
+    def rss(self) -> Optional[int]:
+        return rss_bytes(self.process.pid)
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def sample_requests(url: str) -> Dict[str, List[str]]:
+    """Build the request paths of every scenario from a sample of the served catalogue."""
+
+    with httpx.Client(base_url=url, timeout=60.0) as client:
+        response = client.get("/courses", params={"limit": SAMPLE_SIZE, "fields": "slug,title"})
+        response.raise_for_status()
+        courses = response.json()
+    terms = sorted({word.lower() for course in courses for word in _WORD.findall(course["title"])})
+    return {
+        "list": [f"/courses?limit={LIST_PAGE_SIZE}"],
+        "detail": [f"/courses/{course['slug']}" for course in courses],
+        "search": [f"/courses?search={term}&limit={SEARCH_PAGE_SIZE}" for term in terms] or ["/courses?search=course"],
+    }
+
+
+async def _drive(
+    url: str, paths: Sequence[str], concurrency: int, duration: float, offset: int
+) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+
+        async def worker(number: int) -> None:
+            nonlocal errors
+            index = offset + number
+            while time.perf_counter() < deadline:
+                path = paths[index % len(paths)]
+                index += concurrency
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    await response.aread()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return latencies, errors
+
+
+def _drive_process(
+    url: str, paths: Sequence[str], concurrency: int, duration: float, offset: int
+) -> Tuple[List[float], int]:
+    return asyncio.run(_drive(url, paths, concurrency, duration, offset))
+
+
+def run_load(
+    pool: ProcessPoolExecutor,
+    processes: int,
+    url: str,
+    paths: Sequence[str],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, Any]:
+    """Request ``paths`` round-robin at ``concurrency`` for ``duration`` seconds."""
+
+    shares = [concurrency // processes + (1 if index < concurrency % processes else 0) for index in range(processes)]
+    started = time.perf_counter()
+    futures = [
+        pool.submit(_drive_process, url, paths, share, duration, sum(shares[:index]))
+        for index, share in enumerate(shares)
+        if share
+    ]
+    latencies: List[float] = []
+    errors = 0
+    for future in futures:
+        process_latencies, process_errors = future.result()
+        latencies.extend(process_latencies)
+        errors += process_errors
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def benchmark_size(args: argparse.Namespace, pool: ProcessPoolExecutor, size: int) -> Dict[str, Any]:
+    data_dir = build_catalogue(args.workdir / f"catalogue-{size}-{args.seed}", size, args.seed)
+    database = args.workdir / f"{data_dir.name}.sqlite3"
+    for path in database.parent.glob(f"{database.name}*"):
+        path.unlink()
+    result: Dict[str, Any] = {"size": size}
+    if args.store == "shared":
+        catalog_dir = args.workdir / f"{data_dir.name}.catalog"
+        shutil.rmtree(catalog_dir, ignore_errors=True)
+        started = time.perf_counter()
+        publish_generation(data_dir, catalog_dir)
+        result["publish_seconds"] = round(time.perf_counter() - started, 3)
+
+    server = Server(data_dir, args.store, args.workdir)
+    try:
+        ready_seconds = server.wait_ready()
+        result.update(ready_seconds=round(ready_seconds, 3), rss_ready_bytes=server.rss, scenarios={})
+        requests = sample_requests(server.url)
+        for scenario in args.scenarios:
+            runs = []
+            for concurrency in args.concurrency:
+                run_load(pool, args.processes, server.url, requests[scenario], concurrency, args.warmup)
+                run = run_load(pool, args.processes, server.url, requests[scenario], concurrency, args.duration)
+                run["rss_bytes"] = server.rss
+                runs.append(run)
+                print(
+                    f"{size:>7} {scenario:<7} c={concurrency:<4} {run['rps']:>9.1f} req/s"
+                    f"  p50 {run['p50_ms']:.2f}ms  p95 {run['p95_ms']:.2f}ms  p99 {run['p99_ms']:.2f}ms"
+                    f"  errors {run['errors']}",
+                    file=sys.stderr,
+                )
+            result["scenarios"][scenario] = runs
+        result["rss_final_bytes"] = server.rss
+        return result
+    finally:
+        server.stop()
+
+
+def _integers(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the courses API on synthetic catalogues.")
+    parser.add_argument("--sizes", type=_integers, default=list(DEFAULT_SIZES), help="Comma-separated catalogue sizes.")
+    parser.add_argument("--concurrency", type=_integers, default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated catalogues.")
+    parser.add_argument("--store", choices=("memory", "sqlite", "shared"), default="memory")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of measured load per run.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unmeasured load before each run.")
+    parser.add_argument("--processes", type=int, default=max(1, min(4, (os.cpu_count() or 1) // 2)))
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "courses-bench")
+    parser.add_argument("--output", type=Path, help="Write the results here as JSON; printed otherwise.")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        parser.error("the benchmark needs httpx: pip install httpx")
+    unknown = sorted(set(args.scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    report: Dict[str, Any] = {
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "store": args.store,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "duration": args.duration,
+        "processes": args.processes,
+        "sizes": [],
+    }
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        for size in args.sizes:
+            report["sizes"].append(benchmark_size(args, pool, size))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+        print(f"Wrote results to '{args.output}'", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Generate synthetic courses for scaling tests.
+
+Each course is written as JSON in exactly the shape parse_markdown_file in
+courses_json.py produces (listData with topics, listItems with taglines,
+descriptions and key ideas) and, optionally, as the matching Markdown in the
+_original/ format. Output depends only on the seed: course N is generated from
+its own random.Random("<seed>:<N>"), whatever the number of processes.
+
+    python3 dev/courses_generate.py 100000 --output generated/json --markdown generated/_original
+"""
+
+import os
+import re
+import json
+import time
+import random
+import argparse
+from multiprocessing import Pool
+
+SUBJECTS = [
+    "AI Engineering", "Machine Learning", "Data Engineering", "Cloud Computing", "Cybersecurity",
+    "Product Management", "Digital Marketing", "Customer and Distribution", "Marketing and Advertising",
+    "Business English", "Supply Chain", "Financial Analysis", "Project Management", "UX Design",
+    "Software Architecture", "DevOps", "Natural Language Processing", "Computer Vision", "Robotics",
+    "Statistics", "Linear Algebra", "Negotiation", "Public Speaking", "Leadership", "Sales Strategy",
+]
+PREFIXES = ["Understanding", "Introduction to", "Foundations of", "Applied", "Advanced", "Practical", "Mastering"]
+FOCUSES = [
+    "Principles", "Workflows", "Tools", "Case Studies", "Best Practices", "Systems", "Strategies",
+    "Fundamentals", "Patterns", "Operations", "Ethics", "Metrics", "Models", "Pipelines", "Communication",
+]
+TOPIC_TEMPLATES = [
+    "Foundations of {s}", "History and Evolution of {s}", "Core Concepts in {s}", "{s} Workflow",
+    "Key Disciplines in {s}", "{s} in Society", "Tools and Platforms for {s}", "Challenges and Ethics in {s}",
+    "{s} Around the World", "The Future of {s}", "Measuring Success in {s}", "{s} Case Studies",
+    "Teams and Roles in {s}", "Common Mistakes in {s}", "{f} for {s}", "Scaling {s}", "{s} and Regulation",
+]
+WORDS = """
+ability adapt analysis apply approach architecture automate balance benefit brand build business capacity
+challenge change client collaborate communicate company compare complex concept connect context control cost
+create critical culture customer data decision define deliver demand deploy design develop digital discover
+efficient engage environment evaluate evidence example experience experiment explain feedback focus framework
+global goal growth guide identify impact improve industry influence information innovate insight integrate
+learn market measure method model monitor network objective optimise organise outcome partner performance plan
+platform practice predict present principle process product project quality reason reliable research resource
+result review risk role scale security service share signal skill solution source stakeholder strategy
+structure success support system team technique technology test tool trend understand value vision workflow
+""".split()
+STATUSES = ["WIP", "WIP", "WIP", "DONE", "REVIEW"]
+IMAGE_BASE = "https://com25.s3.eu-west-2.amazonaws.com/640"
+CTA = " https://www.amazon.co.uk/?tag=fs08-21"
+
+
+def slugify(text):
+    """ASCII-only stand-in for python-slugify, matching it on the generated text."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def sentence(rng, low, high):
+    """A sentence of low..high words, lengths roughly normal around the middle."""
+    count = max(low, min(high, round(rng.gauss((low + high) / 2, (high - low) / 4))))
+    words = rng.choices(WORDS, k=count)
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+def paragraph(rng, low, high):
+    """Sentences adding up to roughly low..high words."""
+    target = rng.randint(low, high)
+    sentences, length = [], 0
+    while length < target:
+        text = sentence(rng, 8, 20)
+        sentences.append(text)
+        length += len(text.split())
+    return " ".join(sentences)
+
+
+def generate_course(seed, number):
+    """Return (markdown_fields, parsed_json) for course ``number``."""
+    rng = random.Random(f"{seed}:{number}")
+    subject = rng.choice(SUBJECTS)
+    title = f"{rng.choice(PREFIXES)} {subject} {rng.choice(FOCUSES)} {number}"
+    _id = slugify(title)
+
+    topic_count = rng.choices([0, 4, 6, 8, 10], weights=[1, 2, 3, 3, 4])[0]
+    templates = rng.sample(TOPIC_TEMPLATES, topic_count)
+    topics = [template.format(s=subject, f=rng.choice(FOCUSES)) for template in templates]
+    lede = sentence(rng, 10, 22)
+    overview = paragraph(rng, 40, 90)
+
+    sessions = []
+    for topic in topics:
+        sessions.append({
+            "title": topic,
+            "tagline": sentence(rng, 3, 12),
+            "description": paragraph(rng, 20, 55),
+            "key_ideas": [f"**{sentence(rng, 5, 12)}**" for _ in range(rng.choice([3, 4, 5, 5, 5]))],
+            "image": f"{IMAGE_BASE}/{slugify(topic)}.jpg",
+        })
+    if topics:
+        sessions.append({
+            "title": "Conclusion",
+            "tagline": sentence(rng, 6, 14),
+            "description": paragraph(rng, 20, 45),
+            "key_ideas": [],
+            "image": None,
+        })
+        steps = [f"- {sentence(rng, 5, 10)[:-1]} **{rng.choice(topics)}**." for _ in range(rng.randint(2, 4))]
+        sessions.append({
+            "title": "Next Steps",
+            "tagline": steps[0],
+            "description": "\n".join(steps[1:]),
+            "key_ideas": [],
+            "image": None,
+        })
+
+    listData = {
+        "id": _id,
+        "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:"
+                f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}.{rng.randint(0, 999999):06d}",
+        "name": title,
+        "status": rng.choice(STATUSES),
+        "cat": "NA",
+        "slug": _id,
+        "title": title,
+        "tagline": "NA",
+        "description": "NA",
+        "db": "2025DB",
+        "collection": "QA",
+        "data": "NA",
+        "cta": CTA,
+        "year": "2025",
+        "image": "NA",
+        "content": f"{lede}\n\n{overview}",
+        "topics": [f"{i+1}. {topic}" for i, topic in enumerate(topics)],
+    }
+    listItems = []
+    for rank, session in enumerate(sessions, start=1):
+        item_slug = slugify(session["title"])
+        listItems.append({
+            "id": item_slug,
+            "name": session["title"],
+            "status": "WIP",
+            "cat": "NA",
+            "slug": item_slug,
+            "title": session["title"],
+            "tagline": session["tagline"],
+            "description": session["description"],
+            "key-ideas": [f"{i+1}. {idea}" for i, idea in enumerate(session["key_ideas"])],
+            "db": "2025DB",
+            "collection": "COURSES",
+            "data": "GPT4",
+            "cta": CTA,
+            "year": "2025",
+            "image": session["image"] or "NA",
+            "rank": rank,
+        })
+    markdown = {"title": title, "lede": lede, "overview": overview, "topics": topics, "sessions": sessions}
+    return markdown, {"_id": _id, "listData": listData, "listItems": listItems}
+
+
+def render_markdown(course):
+    """Render a course in the _original/ Markdown format read by parse_markdown_file."""
+    parts = [f"# {course['title']}\n    \n    {course['lede']}\n\n{course['overview']}\n"]
+    if course["topics"]:
+        parts.append("## Topics\n\n" + "".join(f"{i+1}. {topic}  \n" for i, topic in enumerate(course["topics"])))
+    for session in course["sessions"]:
+        section = f"## {session['title']}\n\n\t{session['tagline']}\n\n{session['description']}\n"
+        if session["key_ideas"]:
+            section += "\n**Key Ideas:**\n" + "".join(f"{i+1}. {idea}\n" for i, idea in enumerate(session["key_ideas"]))
+        if session["image"]:
+            section += f"\n![{session['title']}]({session['image']})\n"
+        parts.append(section)
+    return "\n".join(parts)
+
+
+def write_courses(job):
+    """Generate and write courses start..stop-1; runs in a worker process."""
+    seed, start, stop, output_folder, markdown_folder, series = job
+    written = 0
+    for number in range(start, stop):
+        markdown, parsed_data = generate_course(seed, number)
+        base_name = f"{number}-{series}"
+        with open(os.path.join(output_folder, f"{base_name}.json"), "w", encoding="utf-8") as outfile:
+            json.dump(parsed_data, outfile, indent=2, ensure_ascii=False)
+        if markdown_folder:
+            with open(os.path.join(markdown_folder, f"{base_name}.md"), "w", encoding="utf-8") as outfile:
+                outfile.write(render_markdown(markdown))
+        written += 1
+    return written
+
+
+def main(count, output_folder, markdown_folder=None, seed=0, processes=None, series="synthetic"):
+    os.makedirs(output_folder, exist_ok=True)
+    if markdown_folder:
+        os.makedirs(markdown_folder, exist_ok=True)
+    chunk = 500
+    jobs = [
+        (seed, start, min(start + chunk, count + 1), output_folder, markdown_folder, series)
+        for start in range(1, count + 1, chunk)
+    ]
+    started = time.perf_counter()
+    with Pool(processes or os.cpu_count()) as pool:
+        written = sum(pool.imap_unordered(write_courses, jobs))
+    print(f"Generated {written} courses in '{output_folder}' in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic course JSON (and Markdown) files.")
+    parser.add_argument("count", type=int, help="number of courses to generate")
+    parser.add_argument("--output", default="./generated/json", help="folder for the JSON files")
+    parser.add_argument("--markdown", help="also write _original/-style Markdown files to this folder")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--series", default="synthetic", help="file name suffix, as in 1-ai-engineering.json")
+    args = parser.parse_args()
+    main(args.count, args.output, args.markdown, args.seed, args.processes, args.series)